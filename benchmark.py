@@ -0,0 +1,321 @@
+# benchmark.py
+"""
+Offline benchmarks for worker tuning.
+
+    python benchmark.py threads --model tiny --cpu-threads 1,2,4,8 --num-workers 1,2
+    python benchmark.py compute --model tiny --device cpu --compute-types float32,int8_float32,int8
+    python benchmark.py preprocess --seconds 300 --source-sr 44100
+    python benchmark.py timestamps --model tiny --device cpu
+
+The threads sweep runs each configuration in a fresh subprocess because
+BLAS/OpenMP thread counts are fixed once numpy is imported. Without --audio a synthetic clip
+is used, which is fine for relative throughput but not for accuracy.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+SAMPLE_RATE = 16000
+
+
+def _int_list(raw: str) -> List[int]:
+    return [int(x) for x in raw.split(",") if x.strip()]
+
+
+def synth_audio(seconds: float, seed: int = 0):
+    """Amplitude-modulated harmonic tones with pauses and light noise (speech-ish envelope)."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 2.5 * t) > -0.2) * (np.sin(2 * np.pi * 0.17 * t) > -0.5)
+    audio = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def _audio_file(args) -> str:
+    if args.audio:
+        return args.audio
+    import soundfile as sf
+    path = os.path.join(tempfile.gettempdir(), f"bench_synth_{int(args.seconds)}s.wav")
+    if not os.path.exists(path):
+        sf.write(path, synth_audio(args.seconds), SAMPLE_RATE)
+    return path
+
+
+def _print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    print("  ".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        cells = []
+        for c in columns:
+            v = row.get(c)
+            cells.append(f"{v:14.3f}" if isinstance(v, float) else f"{str(v):>14}")
+        print("  ".join(cells))
+
+
+# =============
+# threads sweep
+# =============
+def threads_run(args) -> None:
+    """Child process: one configuration, prints a JSON line."""
+    import runtime_tuning
+    runtime_tuning.configure()
+    import logging
+    from transcription_system import ProfessionalTranscriber
+    logging.getLogger("transcription_system").setLevel(logging.WARNING)
+
+    audio_path = _audio_file(args)
+    load_start = time.time()
+    t = ProfessionalTranscriber(model_size=args.model, compute_type=args.compute_type)
+    load_time = time.time() - load_start
+    t.transcribe_audio(audio_path, vad_filter=False)  # warm-up
+
+    def _job(_):
+        r = t.transcribe_audio(audio_path, vad_filter=False)
+        return r["duration"], r["preprocess_time"], r["transcription_time"]
+
+    start = time.time()
+    # As many jobs in flight as the handler's concurrency_modifier admits in production
+    with ThreadPoolExecutor(max_workers=t.runtime["concurrency"]) as pool:
+        done = list(pool.map(_job, range(args.jobs)))
+    wall = time.time() - start
+    audio = sum(d[0] for d in done)
+    print(json.dumps({
+        "cpu_threads": t.runtime["cpu_threads"],
+        "num_workers": t.runtime["num_workers"],
+        "blas_threads": t.runtime["blas_threads"],
+        "load_s": load_time,
+        "preprocess_s": sum(d[1] for d in done) / len(done),
+        "decode_s": sum(d[2] for d in done) / len(done),
+        "x_realtime": audio / wall,
+        "jobs_per_hour": len(done) / wall * 3600,
+    }))
+
+
+def threads_sweep(args) -> None:
+    rows = []
+    for workers in _int_list(args.num_workers):
+        for threads in _int_list(args.cpu_threads):
+            env = dict(os.environ)
+            env.update({
+                "WHISPER_CPU_THREADS": str(threads),
+                "WHISPER_NUM_WORKERS": str(workers),
+                "WORKER_CONCURRENCY": str(workers),
+                "BLAS_NUM_THREADS": str(args.blas_threads or threads),
+                "PREPROCESS_THREADS": str(args.blas_threads or threads),
+            })
+            cmd = [sys.executable, os.path.abspath(__file__), "threads-run",
+                   "--model", args.model, "--compute-type", args.compute_type,
+                   "--jobs", str(args.jobs), "--seconds", str(args.seconds)]
+            if args.audio:
+                cmd += ["--audio", args.audio]
+            proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+            if proc.returncode != 0 or not lines:
+                print(f"cpu_threads={threads} num_workers={workers} failed:\n{proc.stderr[-2000:]}", file=sys.stderr)
+                continue
+            rows.append(json.loads(lines[-1]))
+    _print_table(rows, ["cpu_threads", "num_workers", "blas_threads", "preprocess_s", "decode_s",
+                        "x_realtime", "jobs_per_hour"])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+# =================
+# compute-type RTF
+# =================
+def _measure_rtf(t, audio_path: str, jobs: int, vad_filter, **options) -> Dict[str, float]:
+    t.transcribe_audio(audio_path, vad_filter=vad_filter, **options)  # warm-up
+    decode, duration = 0.0, 0.0
+    for _ in range(jobs):
+        r = t.transcribe_audio(audio_path, vad_filter=vad_filter, **options)
+        decode += r["transcription_time"]
+        duration += r["duration"]
+    return {"decode_s": decode / jobs, "rtf": decode / duration if duration else 0.0}
+
+
+def compute_sweep(args) -> None:
+    import runtime_tuning
+    runtime_tuning.configure()
+    import logging
+    from transcription_system import ProfessionalTranscriber
+    logging.getLogger("transcription_system").setLevel(logging.WARNING)
+
+    audio_path = _audio_file(args)
+    rows = []
+    # Each explicit type with VAD off isolates the model cost; the final
+    # "auto" row is the serving configuration (auto type + device decode defaults).
+    runs = [(ct, False) for ct in args.compute_types.split(",") if ct] + [("auto", None)]
+    for requested, vad_filter in runs:
+        load_start = time.time()
+        t = ProfessionalTranscriber(model_size=args.model, device=args.device, compute_type=requested)
+        load_time = time.time() - load_start
+        row = {"requested": requested, "device": t.device, "compute_type": t.compute_type,
+               "vad_filter": t.decode_defaults["vad_filter"] if vad_filter is None else vad_filter,
+               "load_s": load_time}
+        row.update(_measure_rtf(t, audio_path, args.jobs, vad_filter))
+        rows.append(row)
+        del t
+    baseline = next((r["rtf"] for r in rows if r["compute_type"] == "float32"), None)
+    for row in rows:
+        row["speedup"] = baseline / row["rtf"] if baseline and row["rtf"] else None
+    _print_table(rows, ["requested", "device", "compute_type", "vad_filter", "load_s", "rtf", "speedup"])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+# ==========================
+# preprocessing backends
+# ==========================
+# Minimum SNR (dB) of each torch stage against the librosa reference. The
+# STFT path should agree to float32 rounding; resampling uses a different
+# (sinc) filter than soxr, so it only has to agree in-band.
+PARITY_MIN_SNR_DB = {"resample": 40.0, "normalize": 100.0, "reduce_noise": 60.0}
+
+
+def _snr_db(ref, test) -> float:
+    import numpy as np
+    n = min(len(ref), len(test))
+    err = np.sum((ref[:n].astype(np.float64) - test[:n]) ** 2)
+    return float("inf") if err == 0 else float(10 * np.log10(np.sum(ref[:n].astype(np.float64) ** 2) / err))
+
+
+def preprocess_bench(args) -> None:
+    import runtime_tuning
+    runtime_tuning.configure()
+    import librosa
+    import numpy as np
+    import torch
+    from transcription_system import make_preprocessor, PREPROCESS_BACKENDS
+
+    torch.set_num_threads(runtime_tuning.configure()["preprocess_threads"])
+    source = synth_audio(args.seconds)
+    if args.source_sr != SAMPLE_RATE:
+        source = librosa.resample(source, orig_sr=SAMPLE_RATE, target_sr=args.source_sr)
+    backends = {name: make_preprocessor(name) for name in PREPROCESS_BACKENDS}
+    stages = {
+        "resample": lambda p, x: p.resample(x, args.source_sr, SAMPLE_RATE),
+        "normalize": lambda p, x: p.normalize_audio(x),
+        "reduce_noise": lambda p, x: p.reduce_noise(x, SAMPLE_RATE),
+    }
+    # Every backend gets the reference (librosa) output of the previous stage as input
+    ref = backends["librosa"]
+    inputs = {"resample": source}
+    inputs["normalize"] = stages["resample"](ref, source)
+    inputs["reduce_noise"] = stages["normalize"](ref, inputs["normalize"])
+    expected = {name: fn(ref, inputs[name]) for name, fn in stages.items()}
+
+    rows, failed = [], False
+    for stage, fn in stages.items():
+        if stage == "resample" and args.source_sr == SAMPLE_RATE:
+            continue
+        for name, pre in backends.items():
+            fn(pre, inputs[stage])  # warm-up (numba JIT, CUDA context, windows)
+            times = []
+            for _ in range(args.jobs):
+                t = time.time()
+                out = fn(pre, inputs[stage])
+                if getattr(pre, "torch_device", None) is not None and pre.torch_device.type == "cuda":
+                    torch.cuda.synchronize()
+                times.append(time.time() - t)
+            snr = _snr_db(expected[stage], out)
+            ok = snr >= PARITY_MIN_SNR_DB[stage] and abs(len(out) - len(expected[stage])) <= 1
+            failed |= not ok
+            rows.append({"stage": stage, "backend": name, "device": str(getattr(pre, "torch_device", "cpu")),
+                         "seconds": min(times), "x_realtime": args.seconds / min(times),
+                         "parity_snr_db": min(snr, 999.0), "parity": "ok" if ok else "FAIL"})
+    _print_table(rows, ["stage", "backend", "device", "seconds", "x_realtime", "parity_snr_db", "parity"])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+# =========================
+# timestamp precision tiers
+# =========================
+def timestamps_sweep(args) -> None:
+    import runtime_tuning
+    runtime_tuning.configure()
+    import logging
+    from transcription_system import ProfessionalTranscriber, TIMING_PRECISIONS
+    logging.getLogger("transcription_system").setLevel(logging.WARNING)
+
+    audio_path = _audio_file(args)
+    t = ProfessionalTranscriber(model_size=args.model, device=args.device, compute_type=args.compute_type)
+    rows = []
+    for timing in TIMING_PRECISIONS:
+        # Preprocessing is identical across tiers, so skip it to isolate decode cost
+        row = {"timing": timing, "device": t.device, "compute_type": t.compute_type}
+        row.update(_measure_rtf(t, audio_path, args.jobs, False, timing=timing, preprocess_profile="none"))
+        rows.append(row)
+    baseline = next(r["rtf"] for r in rows if r["timing"] == "word")
+    for row in rows:
+        row["speedup"] = baseline / row["rtf"] if row["rtf"] else None
+    _print_table(rows, ["timing", "device", "compute_type", "decode_s", "rtf", "speedup"])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+# ===
+# CLI
+# ===
+def main() -> None:
+    p = argparse.ArgumentParser(description="Worker tuning benchmarks.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    def _common(sp):
+        sp.add_argument("--model", default="tiny")
+        sp.add_argument("--audio", help="Audio file to use instead of a synthetic clip")
+        sp.add_argument("--seconds", type=float, default=30.0, help="Synthetic clip length")
+        sp.add_argument("--jobs", type=int, default=4, help="Measured transcriptions per configuration")
+        sp.add_argument("--out", help="Write the result rows here as JSON")
+
+    sp = sub.add_parser("threads", help="Throughput vs CTranslate2/BLAS thread settings")
+    _common(sp)
+    sp.add_argument("--compute-type", default="int8")
+    sp.add_argument("--cpu-threads", default=",".join(str(2 ** i) for i in range(0, 4)))
+    sp.add_argument("--num-workers", default="1,2")
+    sp.add_argument("--blas-threads", type=int, default=0, help="Pin BLAS threads (default: = cpu_threads)")
+    sp.set_defaults(func=threads_sweep)
+
+    sp = sub.add_parser("threads-run", help=argparse.SUPPRESS)
+    _common(sp)
+    sp.add_argument("--compute-type", default="int8")
+    sp.set_defaults(func=threads_run)
+
+    sp = sub.add_parser("compute", help="Real-time factor per device / compute type")
+    _common(sp)
+    sp.add_argument("--device", default="cpu", help="auto | cuda | cpu")
+    sp.add_argument("--compute-types", default="float32,int8_float32,int8")
+    sp.set_defaults(func=compute_sweep)
+
+    sp = sub.add_parser("preprocess", help="librosa vs torch preprocessing: speed and numerical parity")
+    _common(sp)
+    sp.add_argument("--source-sr", type=int, default=44100, help="Sample rate to resample from")
+    sp.set_defaults(func=preprocess_bench)
+
+    sp = sub.add_parser("timestamps", help="Decode latency per timing precision (none / segment / word)")
+    _common(sp)
+    sp.add_argument("--device", default="cpu", help="auto | cuda | cpu")
+    sp.add_argument("--compute-type", default="auto")
+    sp.set_defaults(func=timestamps_sweep)
+
+    args = p.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 # handler.py
+# Size BLAS/OpenMP/numba thread pools before numpy & co. are imported
+import runtime_tuning
+runtime_tuning.configure()
+
 import os
 import io
 import time
 import base64
 import shutil
-import tempfile
+import asyncio
+import threading
 from typing import Dict, Any, Optional
 
 import requests
@@ -14,15 +19,30 @@ from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Import your transcription logic
-from transcription_system import ProfessionalTranscriber
+from transcription_system import ProfessionalTranscriber, PREPROCESS_PROFILES, TIMING_PRECISIONS
+from incremental import SegmentCache
+from workspace import JobWorkspace, ScratchQuotaExceeded
 
 # =========================
 # Environment Configuration
 # =========================
 MODEL_SIZE      = os.getenv("WHISPER_MODEL_SIZE", "large-v3")
-COMPUTE_TYPE    = os.getenv("WHISPER_COMPUTE_TYPE", "float16")  # e.g. "int8_float16"
+DEVICE          = os.getenv("WHISPER_DEVICE", "auto")           # "auto" | "cuda" | "cpu"
+COMPUTE_TYPE    = os.getenv("WHISPER_COMPUTE_TYPE", "auto")     # e.g. "float16", "int8_float16", "int8"
 LANGUAGE_DFLT   = os.getenv("WHISPER_LANGUAGE", "en")
-VAD_FILTER_DFLT = os.getenv("WHISPER_VAD_FILTER", "false").lower() == "true"
+# Unset => per-device default (off on GPU, on for CPU endpoints)
+_VAD_ENV        = os.getenv("WHISPER_VAD_FILTER", "").lower()
+VAD_FILTER_DFLT = (_VAD_ENV == "true") if _VAD_ENV else None
+PREPROCESS_DFLT = os.getenv("PREPROCESS_PROFILE", "full")    # "none" | "fast" | "full" | "auto"
+PREPROCESS_BACKEND = os.getenv("PREPROCESS_BACKEND", "librosa") # "librosa" | "torch"
+DRAFT_MODEL_SIZE = os.getenv("WHISPER_DRAFT_MODEL_SIZE", "base")  # loaded on first "refine" job
+REFINE_DFLT     = os.getenv("WHISPER_REFINE", "false").lower() == "true"
+TIMING_DFLT     = os.getenv("WHISPER_TIMING", "auto")  # "auto" | "none" | "segment" | "word"
+
+# Incremental re-transcription cache: in memory per warm worker, optionally
+# persisted (e.g. under /runpod-volume) so every worker can reuse chunks
+INCREMENTAL_CACHE_DIR     = os.getenv("INCREMENTAL_CACHE_DIR", "")
+INCREMENTAL_CACHE_ENTRIES = int(os.getenv("INCREMENTAL_CACHE_ENTRIES", "4096"))
 
 # RunPod S3 (Network Volume) — optional; if not provided, bucket+key mode is unavailable
 RUNPOD_S3_ACCESS_KEY = os.getenv("RUNPOD_S3_ACCESS_KEY", "")
@@ -37,6 +57,7 @@ MOUNT_ROOT = os.getenv("RUNPOD_MOUNT_ROOT", "/runpod-volume")
 # Globals reused across warm jobs
 _transcriber = None
 _s3_client = None
+_load_lock = threading.Lock()  # jobs may start concurrently (WORKER_CONCURRENCY > 1)
 
 
 # ========================
@@ -45,11 +66,18 @@ _s3_client = None
 def _load_model_once():
     """Load the transcription model once per warm container."""
     global _transcriber
-    if _transcriber is None:
-        _transcriber = ProfessionalTranscriber(
-            model_size=MODEL_SIZE,
-            compute_type=COMPUTE_TYPE
-        )
+    if _transcriber is not None:
+        return
+    with _load_lock:
+        if _transcriber is None:
+            _transcriber = ProfessionalTranscriber(
+                model_size=MODEL_SIZE,
+                device=DEVICE,
+                compute_type=COMPUTE_TYPE,
+                preprocess_backend=PREPROCESS_BACKEND,
+                draft_model_size=DRAFT_MODEL_SIZE,
+                segment_cache=SegmentCache(INCREMENTAL_CACHE_ENTRIES, INCREMENTAL_CACHE_DIR or None)
+            )
 
 
 def _get_s3() -> Optional[boto3.client]:
@@ -74,64 +102,66 @@ def _get_s3() -> Optional[boto3.client]:
     return _s3_client
 
 
-def _save_temp_with_suffix(suffix: str) -> str:
-    fd, path = tempfile.mkstemp(suffix=suffix)
-    os.close(fd)
-    return path
-
-
-def _save_from_b64(b64_str: str, suffix: str) -> str:
+def _save_from_b64(ws: JobWorkspace, b64_str: str, suffix: str) -> str:
     data = base64.b64decode(b64_str)
-    out = _save_temp_with_suffix(suffix)
+    out = ws.file(f"input{suffix}", size_hint=len(data))
+    ws.charge(len(data))
     with open(out, "wb") as f:
         f.write(data)
     return out
 
 
-def _save_from_url(url: str, suffix: str, timeout_sec: int = 180) -> str:
+def _save_from_url(ws: JobWorkspace, url: str, suffix: str, timeout_sec: int = 180) -> str:
     """Robust downloader with streaming + retries. Works with presigned URLs (if valid)."""
     attempts = 3
     backoff = 2
     last_err = None
+    out = None
     for i in range(attempts):
         try:
             with requests.get(url, timeout=timeout_sec, stream=True, allow_redirects=True) as r:
                 r.raise_for_status()
-                out = _save_temp_with_suffix(suffix)
+                length = r.headers.get("Content-Length")
+                out = ws.file(f"input{suffix}", size_hint=int(length) if length else None)
                 with open(out, "wb") as f:
                     for chunk in r.iter_content(chunk_size=1024 * 1024):  # 1 MB
                         if chunk:
+                            ws.charge(len(chunk))
                             f.write(chunk)
             return out
+        except ScratchQuotaExceeded:
+            raise
         except Exception as e:
             last_err = e
+            if out is not None:
+                ws.release(out)  # refund the partial file before the next attempt's size check
             if i < attempts - 1:
                 time.sleep(backoff)
                 backoff *= 2
     raise RuntimeError(f"HTTP download failed: {last_err}")
 
 
-def _save_from_bucket(bucket: str, key: str, suffix: str) -> str:
+def _save_from_bucket(ws: JobWorkspace, bucket: str, key: str, suffix: str) -> str:
     """Directly pull from RunPod S3 via boto3 (recommended, avoids presigned URL issues)."""
     s3 = _get_s3()
     if s3 is None:
         raise RuntimeError("S3 credentials not configured in environment (RUNPOD_S3_*).")
-    out = _save_temp_with_suffix(suffix)
+    try:
+        size_hint = s3.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    except ClientError as e:
+        raise RuntimeError(f"S3 download failed: {e}")
+    out = ws.file(f"input{suffix}", size_hint=size_hint)
     try:
         s3.download_file(bucket, key, out)
     except ClientError as e:
-        # Clean up the empty temp file on failure
-        try:
-            os.remove(out)
-        except Exception:
-            pass
         raise RuntimeError(f"S3 download failed: {e}")
+    ws.account(out)
     return out
 
 
-def _save_from_volume(volume_path: str) -> str:
+def _save_from_volume(ws: JobWorkspace, volume_path: str) -> str:
     """
-    Copy a file from the mounted Network Volume into /tmp.
+    Copy a file from the mounted Network Volume into the job workspace.
     Expects a path like /runpod-volume/uploads/file.mp3
     """
     if not os.path.isabs(volume_path):
@@ -141,7 +171,9 @@ def _save_from_volume(volume_path: str) -> str:
     if not os.path.exists(volume_path):
         raise FileNotFoundError(f"volume_path not found: {volume_path}")
     suffix = os.path.splitext(volume_path)[1] or ""
-    out = _save_temp_with_suffix(suffix)
+    size = os.path.getsize(volume_path)
+    out = ws.file(f"input{suffix}", size_hint=size)
+    ws.charge(size)
     with open(volume_path, "rb") as src, open(out, "wb") as dst:
         shutil.copyfileobj(src, dst, length=1024 * 1024)
     return out
@@ -181,6 +213,12 @@ def run(event: Dict[str, Any]) -> Dict[str, Any]:
     Optional common fields:
        "language": "en",
        "vad_filter": false,
+       "preprocess_profile": "full",  # "none" | "fast" | "full" | "auto"
+       "refine": false,               # draft with the small model, re-decode low-confidence spans
+       "refine_threshold": -0.6,      # avg_logprob below which a draft segment is refined
+       "incremental": false,          # reuse cached chunks of a previously submitted recording (no refine)
+       "timing": "auto",              # "none" | "segment" | "word"; auto = word with SRT, none for TXT only
+                                      # ("none" is raised to "segment" when generate_srt is set)
        "max_words_per_line": 7,
        "generate_srt": true,
        "generate_txt": true,
@@ -201,11 +239,27 @@ def run(event: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": "Unsupported extension. Use 'mp3' or 'wav'."}
 
     language   = payload.get("language", LANGUAGE_DFLT)
-    vad_filter = bool(payload.get("vad_filter", VAD_FILTER_DFLT))
+    vad_filter = payload.get("vad_filter", VAD_FILTER_DFLT)
+    vad_filter = None if vad_filter is None else bool(vad_filter)
     max_words_per_line = int(payload.get("max_words_per_line", 7))
     generate_srt = bool(payload.get("generate_srt", True))
     generate_txt = bool(payload.get("generate_txt", True))
     return_files = payload.get("return_files", "inline")  # "inline" | "none"
+    preprocess_profile = (payload.get("preprocess_profile") or PREPROCESS_DFLT).lower()
+    if preprocess_profile not in PREPROCESS_PROFILES:
+        return {"error": f"Unsupported preprocess_profile. Use one of: {', '.join(PREPROCESS_PROFILES)}."}
+    refine = bool(payload.get("refine", REFINE_DFLT))
+    refine_threshold = payload.get("refine_threshold")
+    refine_threshold = None if refine_threshold is None else float(refine_threshold)
+    incremental = bool(payload.get("incremental", False))
+    timing = (payload.get("timing") or TIMING_DFLT).lower()
+    if timing == "auto":
+        # Word alignment only pays off in SRT cue splitting; TXT needs no timestamps at all
+        timing = "word" if generate_srt else "none"
+    if timing not in TIMING_PRECISIONS:
+        return {"error": f"Unsupported timing. Use one of: auto, {', '.join(TIMING_PRECISIONS)}."}
+    if timing == "none" and generate_srt:
+        timing = "segment"  # untimestamped output is one segment per 30 s window, useless as SRT cues
 
     # Make sure we got exactly one source
     source_count = sum(bool(x) for x in [bucket and key, volume_path, file_url, file_b64])
@@ -215,67 +269,109 @@ def run(event: Dict[str, Any]) -> Dict[str, Any]:
     # Ensure model is loaded
     _load_model_once()
 
-    # Materialize the audio into a local temp file
-    try:
-        if bucket and key:
-            audio_path = _save_from_bucket(bucket, key, f".{extension}")
-        elif volume_path:
-            audio_path = _save_from_volume(volume_path)
-        elif file_url:
-            audio_path = _save_from_url(file_url, f".{extension}")
-        else:
-            audio_path = _save_from_b64(file_b64, f".{extension}")
-    except Exception as e:
-        return {"error": f"Failed to fetch audio: {e}"}
-
-    # Transcribe
-    try:
-        results = _transcriber.transcribe_audio(
-            audio_path=audio_path,
-            language=language,
-            vad_filter=vad_filter
-        )
-    except Exception as e:
-        return {"error": f"Transcription failed: {e}"}
-
-    # Base response
-    out: Dict[str, Any] = {
-        "language": results.get("language"),
-        "language_probability": results.get("language_probability"),
-        "duration": results.get("duration"),
-        "transcription_time": results.get("transcription_time"),
-        "text_preview": (results.get("full_text") or "")[:300],
-        "segments_count": len(results.get("segments") or []),
-        "source": (
-            "bucket+key" if (bucket and key) else
-            "volume_path" if volume_path else
-            "file_url" if file_url else
-            "file_b64"
-        ),
-    }
-
-    # Optional SRT/TXT generation
-    if generate_srt or generate_txt:
-        tmpdir = tempfile.mkdtemp()
-        base = os.path.join(tmpdir, "transcription")
-        if generate_srt:
-            try:
-                srt_path = _transcriber.generate_srt(results, base + ".srt", max_words_per_line=max_words_per_line)
-                if return_files == "inline":
-                    with open(srt_path, "r", encoding="utf-8") as f:
-                        out["srt"] = f.read()
-            except Exception as e:
-                out["srt_error"] = f"SRT generation failed: {e}"
-        if generate_txt:
-            try:
-                txt_path = _transcriber.generate_txt(results, base + ".txt")
-                if return_files == "inline":
-                    with open(txt_path, "r", encoding="utf-8") as f:
-                        out["txt"] = f.read()
-            except Exception as e:
-                out["txt_error"] = f"TXT generation failed: {e}"
+    # Everything written for this job lives in one workspace, removed on exit
+    with JobWorkspace() as ws:
+        # Per-stage wall-clock seconds, reported back as "timings"
+        timings: Dict[str, float] = {}
+        job_start = time.time()
 
-    return out
+        # Materialize the audio into the job workspace
+        try:
+            if bucket and key:
+                audio_path = _save_from_bucket(ws, bucket, key, f".{extension}")
+            elif volume_path:
+                audio_path = _save_from_volume(ws, volume_path)
+            elif file_url:
+                audio_path = _save_from_url(ws, file_url, f".{extension}")
+            else:
+                audio_path = _save_from_b64(ws, file_b64, f".{extension}")
+        except Exception as e:
+            return {"error": f"Failed to fetch audio: {e}"}
+        timings["fetch"] = time.time() - job_start
+
+        # Transcribe
+        try:
+            if incremental:
+                results = _transcriber.transcribe_incremental(
+                    audio_path=audio_path,
+                    language=language,
+                    vad_filter=vad_filter,
+                    preprocess_profile=preprocess_profile,
+                    timing=timing
+                )
+            else:
+                results = _transcriber.transcribe_audio(
+                    audio_path=audio_path,
+                    language=language,
+                    vad_filter=vad_filter,
+                    preprocess_profile=preprocess_profile,
+                    refine=refine,
+                    refine_threshold=refine_threshold,
+                    timing=timing
+                )
+        except Exception as e:
+            return {"error": f"Transcription failed: {e}"}
+        timings["preprocess"] = results.get("preprocess_time") or 0.0
+        timings["transcribe"] = results.get("transcription_time") or 0.0
+
+        # Base response
+        out: Dict[str, Any] = {
+            "language": results.get("language"),
+            "language_probability": results.get("language_probability"),
+            "duration": results.get("duration"),
+            "transcription_time": results.get("transcription_time"),
+            "text_preview": (results.get("full_text") or "")[:300],
+            "segments_count": len(results.get("segments") or []),
+            "runtime": _transcriber.runtime,
+            "preprocessing": results.get("preprocessing"),
+            "refinement": results.get("refinement"),
+            "incremental": results.get("incremental"),
+            "timing": timing,
+            "source": (
+                "bucket+key" if (bucket and key) else
+                "volume_path" if volume_path else
+                "file_url" if file_url else
+                "file_b64"
+            ),
+        }
+
+        # Optional SRT/TXT generation
+        outputs_start = time.time()
+        if generate_srt or generate_txt:
+            if generate_srt:
+                try:
+                    srt_path = _transcriber.generate_srt(results, ws.file("transcription.srt"), max_words_per_line=max_words_per_line)
+                    ws.account(srt_path)
+                    if return_files == "inline":
+                        with open(srt_path, "r", encoding="utf-8") as f:
+                            out["srt"] = f.read()
+                except Exception as e:
+                    out["srt_error"] = f"SRT generation failed: {e}"
+            if generate_txt:
+                try:
+                    txt_path = _transcriber.generate_txt(results, ws.file("transcription.txt"))
+                    ws.account(txt_path)
+                    if return_files == "inline":
+                        with open(txt_path, "r", encoding="utf-8") as f:
+                            out["txt"] = f.read()
+                except Exception as e:
+                    out["txt_error"] = f"TXT generation failed: {e}"
+        timings["outputs"] = time.time() - outputs_start
+        timings["total"] = time.time() - job_start
+        out["timings"] = timings
+        out["scratch"] = ws.metrics()
+
+        return out
+
+
+async def run_async(event: Dict[str, Any]) -> Dict[str, Any]:
+    """run() on a worker thread, so RunPod can overlap jobs on one event loop."""
+    return await asyncio.to_thread(run, event)
+
+
+def concurrency_modifier(current_concurrency: int) -> int:
+    """Jobs this worker takes at once; runtime_tuning sized the thread pools for it."""
+    return runtime_tuning.configure()["concurrency"]
 
 
 # ================
@@ -283,4 +379,4 @@ def run(event: Dict[str, Any]) -> Dict[str, Any]:
 # ================
 if __name__ == "__main__":
     print(">>> RunPod serverless worker starting (direct start mode)")
-    runpod.serverless.start({"handler": run})
+    runpod.serverless.start({"handler": run_async, "concurrency_modifier": concurrency_modifier})
@@ -0,0 +1,110 @@
+# incremental.py
+"""
+Chunking and caching for incremental re-transcription.
+
+A growing recording is cut at VAD silence gaps into ~30 s chunks. Each
+chunk is keyed by a hash of its decoded 16 kHz PCM plus the decode
+settings, so on resubmission only new or modified chunks reach the model.
+
+Cut points are chosen greedily from the start of the file and only at gaps
+between two detected speech regions, so appending audio leaves every
+earlier cut (and therefore every earlier chunk hash) unchanged. Inserting
+audio in the middle shifts later content off the 30 ms VAD frame grid and
+may cost a re-transcription of the chunks after the edit.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+CHUNK_TARGET_S = 30.0  # cut at the first silence gap after this much audio
+CHUNK_MAX_S = 60.0     # hard cut if no gap shows up (continuous speech/music)
+
+
+def chunk_boundaries(speech_segments: List[Tuple[float, float]], duration: float,
+                     target_s: float = CHUNK_TARGET_S, max_s: float = CHUNK_MAX_S) -> List[Tuple[float, float]]:
+    """Split [0, duration] at the midpoints of silence gaps between speech segments."""
+    gaps = [(prev_end + next_start) / 2
+            for (_, prev_end), (next_start, _) in zip(speech_segments, speech_segments[1:])]
+    chunks: List[Tuple[float, float]] = []
+    start = 0.0
+    gi = 0
+    while True:
+        # skip gaps too close to the current start
+        while gi < len(gaps) and gaps[gi] - start < target_s:
+            gi += 1
+        if gi < len(gaps) and gaps[gi] - start <= max_s:
+            cut = gaps[gi]
+            gi += 1
+        elif start + max_s < duration:
+            cut = start + max_s
+        else:
+            break
+        chunks.append((start, cut))
+        start = cut
+    if duration > start or not chunks:
+        chunks.append((start, duration))
+    return chunks
+
+
+def chunk_key(pcm: np.ndarray, settings: Dict[str, Any]) -> str:
+    """sha1 of the chunk's int16 PCM and the settings that affect its transcript."""
+    h = hashlib.sha1()
+    h.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    h.update(np.clip(pcm * 32767, -32768, 32767).astype("<i2").tobytes())
+    return h.hexdigest()
+
+
+class SegmentCache:
+    """
+    LRU of chunk key -> {"segments": [...], "language": ...} with times
+    relative to the chunk start. With `directory` set (e.g. on the network
+    volume) entries are also persisted as JSON so other workers can reuse them.
+    """
+
+    def __init__(self, max_entries: int = 4096, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._remember(key, entry)
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)  # atomic, so concurrent readers never see half a file
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
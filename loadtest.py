@@ -0,0 +1,423 @@
+# loadtest.py
+"""
+Local load generator for handler.run.
+
+Replays a JSONL file of job inputs at a target arrival rate, either
+in-process against a pool of `--workers` threads or over HTTP through
+runpod_stub_server (so submit/poll overhead is included), and prints a
+latency / throughput / queueing / per-stage report for capacity planning.
+
+Each JSONL line is a handler input. A line with a "path" key (relative to
+--audio-root) is delivered through the local stand-in chosen by --source:
+
+    b64     -> file_b64
+    http    -> file_url served by a local HTTP server
+    s3      -> bucket+key read by a local S3 stand-in
+    volume  -> volume_path with MOUNT_ROOT pointed at --audio-root
+
+By default the Whisper model is replaced by a stub that sleeps
+`--stub-rtf` seconds per audio second, so the numbers reflect the
+preprocessing/IO pipeline plus a configurable model cost; pass
+--model tiny (or any size) to load a real faster-whisper model instead.
+
+    python loadtest.py --synth 8 --audio-root /tmp/lt
+    python loadtest.py --jobs /tmp/lt/jobs.jsonl --audio-root /tmp/lt --rate 2 --count 200 --workers 4
+"""
+import os
+import io
+import sys
+import json
+import math
+import time
+import wave
+import base64
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import threading
+from types import SimpleNamespace
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+STAGES = ("fetch", "preprocess", "transcribe", "outputs", "total")
+
+StubWord = namedtuple("StubWord", "start end word probability")
+StubSegment = namedtuple("StubSegment", "id start end text avg_logprob words")
+
+
+# ======================
+# Stub model / stand-ins
+# ======================
+def make_stub_model(rtf: float):
+    """Return a drop-in replacement for faster_whisper.WhisperModel that sleeps rtf * audio seconds."""
+
+    class StubWhisperModel:
+        def __init__(self, model_size_or_path: str, device: str = "auto", compute_type: str = "default", **kwargs):
+            self.model_size = model_size_or_path
+            self.device = device
+            self.compute_type = compute_type
+
+        def transcribe(self, audio, word_timestamps: bool = False, **kwargs):
+            duration = len(audio) / SAMPLE_RATE
+            time.sleep(duration * rtf)
+            segments = []
+            t = 0.0
+            while t < duration:
+                end = min(duration, t + 5.0)
+                words = []
+                w = t
+                while w + 0.4 <= end:
+                    words.append(StubWord(w, w + 0.4, " lorem", 0.9))
+                    w += 0.4
+                text = "".join(x.word for x in words) or " ."
+                segments.append(StubSegment(len(segments) + 1, t, end, text, -0.2,
+                                            words if word_timestamps else None))
+                t = end
+            info = SimpleNamespace(language=kwargs.get("language") or "en",
+                                   language_probability=1.0, duration=duration)
+            return iter(segments), info
+
+    return StubWhisperModel
+
+
+class LocalS3:
+    """Minimal stand-in for the boto3 client used by handler._save_from_bucket."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        return {"ContentLength": os.path.getsize(os.path.join(self.root, Key))}
+
+    def download_file(self, bucket: str, key: str, filename: str) -> None:
+        shutil.copyfile(os.path.join(self.root, key), filename)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_file_server(root: str) -> Tuple[ThreadingHTTPServer, str]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), lambda *a, **kw: _QuietHandler(*a, directory=root, **kw))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+
+
+def synth_corpus(root: str, count: int, seconds: float) -> str:
+    """Write `count` noisy-tone 16 kHz WAVs plus a jobs.jsonl referencing them; returns the JSONL path."""
+    os.makedirs(root, exist_ok=True)
+    jobs_path = os.path.join(root, "jobs.jsonl")
+    rng = random.Random(0)
+    with open(jobs_path, "w", encoding="utf-8") as jobs:
+        for i in range(count):
+            name = f"synth_{i:03d}.wav"
+            n = int(seconds * SAMPLE_RATE)
+            freq = 180 + 40 * i
+            buf = io.BytesIO()
+            for k in range(n):
+                v = 0.3 * math.sin(2 * math.pi * freq * k / SAMPLE_RATE) + rng.uniform(-0.02, 0.02)
+                buf.write(int(v * 32767).to_bytes(2, "little", signed=True))
+            with wave.open(os.path.join(root, name), "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(SAMPLE_RATE)
+                w.writeframes(buf.getvalue())
+            jobs.write(json.dumps({"path": name, "extension": "wav"}) + "\n")
+    return jobs_path
+
+
+# ==============
+# Job generation
+# ==============
+def load_jobs(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def arrival_times(count: int, rate: float, process: str, seed: int) -> List[float]:
+    """Offsets (seconds from start) for `count` arrivals at `rate` jobs/s; rate <= 0 means all at t=0."""
+    if rate <= 0:
+        return [0.0] * count
+    rng = random.Random(seed)
+    t, out = 0.0, []
+    for _ in range(count):
+        out.append(t)
+        t += rng.expovariate(rate) if process == "poisson" else 1.0 / rate
+    return out
+
+
+class Delivery:
+    """Rewrites {"path": ...} job lines into a concrete handler source using local stand-ins."""
+
+    def __init__(self, handler_mod, source: str, audio_root: str):
+        self.source = source
+        self.audio_root = os.path.abspath(audio_root)
+        self._httpd = None
+        if source == "http":
+            self._httpd, self.base_url = start_file_server(self.audio_root)
+        elif source == "s3":
+            handler_mod._s3_client = LocalS3(self.audio_root)
+        elif source == "volume":
+            handler_mod.MOUNT_ROOT = self.audio_root
+
+    def input_for(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        job = dict(job)
+        rel = job.pop("path", None)
+        if rel is None:
+            return job
+        job.setdefault("extension", os.path.splitext(rel)[1].lstrip(".").lower() or "mp3")
+        if self.source == "b64":
+            with open(os.path.join(self.audio_root, rel), "rb") as f:
+                job["file_b64"] = base64.b64encode(f.read()).decode("ascii")
+        elif self.source == "http":
+            job["file_url"] = f"{self.base_url}/{rel}"
+        elif self.source == "s3":
+            job["bucket"], job["key"] = "loadtest", rel
+        else:
+            job["volume_path"] = os.path.join(self.audio_root, rel)
+        return job
+
+    def close(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+
+
+# =======
+# Drivers
+# =======
+def run_inprocess(handler_mod, inputs: List[Dict[str, Any]], offsets: List[float], workers: int) -> List[Dict[str, Any]]:
+    records: List[Dict[str, Any]] = []
+
+    def _one(i: int, arrival: float) -> None:
+        start = time.time()
+        try:
+            out = handler_mod.run({"input": inputs[i]})
+        except Exception as e:
+            out = {"error": f"handler raised: {e!r}"}
+        end = time.time()
+        records.append({
+            "ok": not out.get("error"), "error": out.get("error"),
+            "arrival": arrival, "start": start, "end": end,
+            "queue": start - arrival, "service": end - start, "latency": end - arrival,
+            "audio_seconds": out.get("duration") or 0.0, "timings": out.get("timings") or {},
+        })
+
+    t0 = time.time()
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, off in enumerate(offsets):
+            delay = t0 + off - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append((pool.submit(_one, i, t0 + off), t0 + off))
+    for fut, arrival in futures:
+        err = fut.exception()
+        if err is not None:  # failed outside handler.run; still counts as a job
+            now = time.time()
+            records.append({
+                "ok": False, "error": f"job raised: {err!r}",
+                "arrival": arrival, "start": now, "end": now,
+                "queue": now - arrival, "service": 0.0, "latency": now - arrival,
+                "audio_seconds": 0.0, "timings": {},
+            })
+    return records
+
+
+def run_http(handler_mod, inputs: List[Dict[str, Any]], offsets: List[float], workers: int) -> List[Dict[str, Any]]:
+    from runpod_client import RunPodClient
+    from runpod_stub_server import StubRunPod, start_stub_server
+
+    async def _go() -> List[Dict[str, Any]]:
+        stub = StubRunPod(handler=handler_mod.run, workers=workers)
+        runner, base_url = await start_stub_server(stub)
+        records: List[Dict[str, Any]] = []
+        try:
+            async with RunPodClient(endpoint_id="local", base_url=base_url, max_in_flight=len(inputs) or 1,
+                                    max_connections=64, poll_initial=0.02, poll_max=0.25, poll_factor=1.3) as client:
+                t0 = time.time()
+
+                async def _one(i: int, off: float) -> None:
+                    await asyncio.sleep(max(0.0, t0 + off - time.time()))
+                    arrival = time.time()
+                    try:
+                        job_id = await client.submit(inputs[i])
+                        j = await client.poll(job_id)
+                    except Exception as e:
+                        # e.g. an un-retried submit timeout; count it instead of aborting the run
+                        end = time.time()
+                        records.append({
+                            "ok": False, "error": f"client raised: {e!r}",
+                            "arrival": arrival, "start": end, "end": end,
+                            "queue": end - arrival, "service": 0.0, "latency": end - arrival,
+                            "audio_seconds": 0.0, "timings": {},
+                        })
+                        return
+                    end = time.time()
+                    out = j.get("output") or {}
+                    queue = (j.get("delayTime") or 0) / 1000.0
+                    service = (j.get("executionTime") or 0) / 1000.0
+                    records.append({
+                        "ok": j.get("status") == "COMPLETED", "error": j.get("error") or out.get("error"),
+                        "arrival": arrival, "start": arrival + queue, "end": end,
+                        "queue": queue, "service": service, "latency": end - arrival,
+                        "audio_seconds": out.get("duration") or 0.0, "timings": out.get("timings") or {},
+                    })
+
+                await asyncio.gather(*(_one(i, off) for i, off in enumerate(offsets)))
+        finally:
+            await runner.cleanup()
+        return records
+
+    return asyncio.run(_go())
+
+
+# ======
+# Report
+# ======
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    xs = sorted(values)
+    pos = (len(xs) - 1) * q / 100.0
+    lo, hi = int(math.floor(pos)), int(math.ceil(pos))
+    return xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+
+
+def _dist(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def summarize(records: List[Dict[str, Any]], rate: float, workers: int, target_util: float = 0.7) -> Dict[str, Any]:
+    ok = [r for r in records if r["ok"]]
+    report: Dict[str, Any] = {
+        "jobs": len(records),
+        "completed": len(ok),
+        "failed": len(records) - len(ok),
+        "workers": workers,
+        "offered_rate_per_s": rate,
+    }
+    if not ok:
+        report["errors"] = sorted({str(r["error"]) for r in records})[:5]
+        return report
+
+    wall = max(r["end"] for r in ok) - min(r["arrival"] for r in records)
+    service = [r["service"] for r in ok]
+    audio = sum(r["audio_seconds"] for r in ok)
+    mean_service = sum(service) / len(service)
+    report.update({
+        "wall_seconds": wall,
+        "throughput_jobs_per_hour": len(ok) / wall * 3600 if wall > 0 else 0.0,
+        "audio_hours_per_hour": audio / wall if wall > 0 else 0.0,
+        "latency": _dist([r["latency"] for r in ok]),
+        "queue_delay": _dist([r["queue"] for r in ok]),
+        "service_time": _dist(service),
+        "stages": {
+            stage: _dist([r["timings"][stage] for r in ok if stage in r["timings"]])
+            for stage in STAGES if any(stage in r["timings"] for r in ok)
+        },
+        "capacity": {
+            "jobs_per_hour_per_worker": 3600 / mean_service if mean_service > 0 else 0.0,
+            "target_utilization": target_util,
+            "workers_for_offered_rate": math.ceil(rate * mean_service / target_util) if rate > 0 else None,
+        },
+    })
+    if len(ok) != len(records):
+        report["errors"] = sorted({str(r["error"]) for r in records if not r["ok"]})[:5]
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"jobs={report['jobs']} completed={report['completed']} failed={report['failed']} workers={report['workers']}")
+    if "latency" not in report:
+        print(f"errors: {report.get('errors')}")
+        return
+    print(f"throughput: {report['throughput_jobs_per_hour']:.1f} jobs/h, "
+          f"{report['audio_hours_per_hour']:.2f} audio-h/h over {report['wall_seconds']:.1f}s")
+    print(f"{'':14}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    rows = [("latency", report["latency"]), ("queue_delay", report["queue_delay"]), ("service_time", report["service_time"])]
+    rows += [(f"  {k}", v) for k, v in report["stages"].items()]
+    for name, d in rows:
+        print(f"{name:14}" + "".join(f"{d[k]:9.3f}" for k in ("mean", "p50", "p90", "p99", "max")))
+    cap = report["capacity"]
+    print(f"capacity: {cap['jobs_per_hour_per_worker']:.1f} jobs/h/worker; "
+          f"workers for offered rate @{cap['target_utilization']:.0%} util: {cap['workers_for_offered_rate']}")
+
+
+# ===
+# CLI
+# ===
+def main() -> None:
+    p = argparse.ArgumentParser(description="Replay job inputs against handler.run and report latency/throughput.")
+    p.add_argument("--jobs", help="JSONL of handler inputs (optionally with 'path' relative to --audio-root)")
+    p.add_argument("--audio-root", default=".", help="Directory 'path' entries are resolved against")
+    p.add_argument("--synth", type=int, default=0, help="Write N synthetic WAVs + jobs.jsonl into --audio-root and exit")
+    p.add_argument("--synth-seconds", type=float, default=20.0)
+    p.add_argument("--mode", choices=("inprocess", "http"), default="inprocess")
+    p.add_argument("--source", choices=("b64", "http", "s3", "volume"), default="volume")
+    p.add_argument("--rate", type=float, default=1.0, help="Arrivals per second (<=0: submit everything at once)")
+    p.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    p.add_argument("--count", type=int, default=0, help="Number of jobs (default: one pass over --jobs)")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--model", default="stub", help="'stub' or a faster-whisper model size (e.g. tiny)")
+    p.add_argument("--stub-rtf", type=float, default=0.05, help="Stub model seconds per audio second")
+    p.add_argument("--warmup", type=int, default=1, help="Unmeasured jobs run first (JIT/caches warm-up)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--report", help="Also write the JSON report here")
+    args = p.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.synth:
+        print(synth_corpus(args.audio_root, args.synth, args.synth_seconds))
+        return
+    if not args.jobs:
+        p.error("--jobs is required unless --synth is given")
+
+    if args.model != "stub":
+        os.environ["WHISPER_MODEL_SIZE"] = args.model
+    # Thread env vars must be set before numpy/torch load, as in handler.py
+    import runtime_tuning
+    runtime_tuning.configure()
+    import transcription_system
+    if args.model == "stub":
+        transcription_system.WhisperModel = make_stub_model(args.stub_rtf)
+    import handler
+    logging.getLogger("transcription_system").setLevel(logging.WARNING)
+    handler._load_model_once()
+
+    jobs = load_jobs(args.jobs)
+    count = args.count or len(jobs)
+    delivery = Delivery(handler, args.source, args.audio_root)
+    try:
+        inputs = [delivery.input_for(jobs[i % len(jobs)]) for i in range(count)]
+        for i in range(args.warmup):
+            handler.run({"input": inputs[i % count]})
+        offsets = arrival_times(count, args.rate, args.arrival, args.seed)
+        driver = run_http if args.mode == "http" else run_inprocess
+        records = driver(handler, inputs, offsets, args.workers)
+    finally:
+        delivery.close()
+
+    report = summarize(records, args.rate, args.workers)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
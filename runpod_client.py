@@ -0,0 +1,415 @@
+# runpod_client.py
+"""
+Async client for bulk submission to the RunPod transcription endpoint.
+
+Submits many jobs concurrently over one pooled HTTP session, polls them with
+exponential back-off, retries transient failures with jitter and appends each
+finished job to a JSONL file as soon as it completes.
+
+    python runpod_client.py --input-dir ./audio --out results.jsonl --max-in-flight 64 --s3-bucket my-volume
+
+With --s3-bucket each file is uploaded to the RunPod S3 API and the job
+references it by bucket/key; without it files are inlined as base64, which
+only suits short clips (the /run payload is size-limited).
+
+POST /run is not idempotent, so a submit is only retried when the request
+provably never reached the endpoint (connection failure, 429/503); lost
+responses surface as errors instead of duplicate GPU jobs.
+
+Point --base-url at runpod_stub_server.py to try it locally.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import base64
+import hashlib
+import logging
+import argparse
+from typing import Dict, Any, Optional, Callable, Iterable, List
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Environment Configuration
+# =========================
+RUNPOD_API_KEY  = os.getenv("RUNPOD_API_KEY", "")
+RUNPOD_ENDPOINT = os.getenv("RUNPOD_ENDPOINT_ID", "")
+RUNPOD_API_BASE = os.getenv("RUNPOD_API_BASE", "https://api.runpod.ai/v2")
+
+# RunPod S3 (Network Volume) — same variables as handler.py
+RUNPOD_S3_ACCESS_KEY = os.getenv("RUNPOD_S3_ACCESS_KEY", "")
+RUNPOD_S3_SECRET_KEY = os.getenv("RUNPOD_S3_SECRET_KEY", "")
+RUNPOD_S3_ENDPOINT   = os.getenv("RUNPOD_S3_ENDPOINT", "https://s3api-eu-ro-1.runpod.io/")
+RUNPOD_S3_REGION     = os.getenv("RUNPOD_S3_REGION", "eu-ro-1")
+RUNPOD_S3_BUCKET     = os.getenv("RUNPOD_S3_BUCKET", "")
+
+TERMINAL_STATUSES = ("COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT")
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+# Rejections that guarantee a non-idempotent request was not processed
+REJECTED_STATUS_CODES = (429, 503)
+AUDIO_EXTENSIONS = ("mp3", "wav")
+
+
+class RunPodError(RuntimeError):
+    """Raised when the API returns a non-retryable error or retries are exhausted."""
+
+
+def _b64_uploader(path: str) -> Dict[str, Any]:
+    """Default uploader: inline the file as base64 (fine for small files / local testing)."""
+    with open(path, "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    extension = os.path.splitext(path)[1].lstrip(".").lower() or "mp3"
+    return {"file_b64": data, "extension": extension}
+
+
+class S3Uploader:
+    """
+    Upload local files through the RunPod S3-compatible API and return the
+    handler's bucket+key source. Keys are content-addressed
+    (<prefix><sha1>/<basename>), so same-named files never collide and a key
+    that already exists holds exactly this audio; resumed runs skip the upload.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "uploads/",
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+    ):
+        import boto3
+        from botocore.config import Config
+        from botocore.exceptions import ClientError
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client_error = ClientError
+        self.s3 = boto3.client(
+            "s3",
+            aws_access_key_id=access_key or RUNPOD_S3_ACCESS_KEY,
+            aws_secret_access_key=secret_key or RUNPOD_S3_SECRET_KEY,
+            region_name=region or RUNPOD_S3_REGION,
+            endpoint_url=endpoint_url or RUNPOD_S3_ENDPOINT,
+            config=Config(
+                signature_version="s3v4",
+                s3={"addressing_style": "path"},
+                retries={"max_attempts": 5, "mode": "standard"},
+            ),
+        )
+
+    def _stored_size(self, key: str) -> Optional[int]:
+        try:
+            return self.s3.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except self._client_error:
+            return None
+
+    def __call__(self, path: str) -> Dict[str, Any]:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        key = f"{self.prefix}{digest.hexdigest()}/{os.path.basename(path)}"
+        if self._stored_size(key) != os.path.getsize(path):  # missing or a truncated earlier upload
+            self.s3.upload_file(path, self.bucket, key)  # multipart for large files
+        extension = os.path.splitext(path)[1].lstrip(".").lower() or "mp3"
+        return {"bucket": self.bucket, "key": key, "extension": extension}
+
+
+class RunPodClient:
+    """
+    Pooled async client for the RunPod /run and /status endpoints.
+
+    max_in_flight bounds how many jobs are submitted-but-unfinished at once;
+    max_connections bounds concurrent HTTP requests on the shared session.
+    uploader maps a local path to the source fields of the job input
+    (e.g. {"file_url": ...}); it may be sync (run in a thread) or async.
+    """
+
+    def __init__(
+        self,
+        endpoint_id: Optional[str] = None,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_in_flight: int = 32,
+        max_connections: int = 16,
+        poll_initial: float = 1.0,
+        poll_max: float = 30.0,
+        poll_factor: float = 1.5,
+        max_retries: int = 5,
+        retry_base: float = 0.5,
+        retry_cap: float = 20.0,
+        request_timeout: float = 60.0,
+        job_timeout: Optional[float] = None,
+        uploader: Optional[Callable[[str], Any]] = None,
+    ):
+        self.endpoint_id = endpoint_id or RUNPOD_ENDPOINT
+        self.api_key = api_key if api_key is not None else RUNPOD_API_KEY
+        self.base_url = (base_url or RUNPOD_API_BASE).rstrip("/")
+        self.max_in_flight = max_in_flight
+        self.max_connections = max_connections
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_factor = poll_factor
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.request_timeout = request_timeout
+        self.job_timeout = job_timeout
+        self.uploader = uploader or _b64_uploader
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    # ----------------
+    # Session handling
+    # ----------------
+    async def __aenter__(self) -> "RunPodClient":
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        self._session = aiohttp.ClientSession(
+            headers=headers,
+            connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def run_url(self) -> str:
+        return f"{self.base_url}/{self.endpoint_id}/run"
+
+    def status_url(self, job_id: str) -> str:
+        return f"{self.base_url}/{self.endpoint_id}/status/{job_id}"
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential back-off."""
+        return random.uniform(0, min(self.retry_cap, self.retry_base * (2 ** attempt)))
+
+    async def _request(self, method: str, url: str, idempotent: bool = True, **kwargs) -> Dict[str, Any]:
+        """
+        Send a request, retrying transient failures. With idempotent=False only
+        failures where the server cannot have acted on the request are retried.
+        """
+        if self._session is None:
+            raise RuntimeError("RunPodClient must be used as 'async with RunPodClient(...)'")
+        last_err: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._session.request(method, url, **kwargs) as r:
+                    retryable = RETRYABLE_STATUS_CODES if idempotent else REJECTED_STATUS_CODES
+                    if r.status in retryable:
+                        last_err = RunPodError(f"HTTP {r.status} from {url}: {await r.text()}")
+                    elif r.status >= 400:
+                        raise RunPodError(f"HTTP {r.status} from {url}: {await r.text()}")
+                    else:
+                        return await r.json(content_type=None)
+            except aiohttp.ClientConnectorError as e:
+                last_err = e  # never connected, so nothing was sent
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not idempotent:
+                    raise RunPodError(f"{method} {url} failed, outcome unknown (not retried): {e!r}")
+                last_err = e
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                logger.debug(f"Retrying {method} {url} in {delay:.2f}s ({last_err})")
+                await asyncio.sleep(delay)
+        raise RunPodError(f"{method} {url} failed after {self.max_retries + 1} attempts: {last_err}")
+
+    # ===========
+    # Job actions
+    # ===========
+    async def submit(self, input_payload: Dict[str, Any]) -> str:
+        """POST /run and return the job id (not retried once the request may have been accepted)."""
+        j = await self._request("POST", self.run_url, idempotent=False, data=json.dumps({"input": input_payload}))
+        job_id = j.get("id")
+        if not job_id:
+            raise RunPodError(f"No job id in response: {j}")
+        return job_id
+
+    async def status(self, job_id: str) -> Dict[str, Any]:
+        return await self._request("GET", self.status_url(job_id))
+
+    async def poll(self, job_id: str) -> Dict[str, Any]:
+        """
+        Poll until the job reaches a terminal status.
+
+        The interval grows geometrically from poll_initial to poll_max and
+        snaps back to poll_initial whenever the job changes state (e.g.
+        IN_QUEUE -> IN_PROGRESS), so short jobs finish promptly while long
+        ones don't hammer the API.
+        """
+        delay = self.poll_initial
+        last_status = None
+        deadline = time.monotonic() + self.job_timeout if self.job_timeout else None
+        while True:
+            j = await self.status(job_id)
+            status = j.get("status")
+            if status in TERMINAL_STATUSES:
+                return j
+            if status != last_status:
+                delay = self.poll_initial
+                last_status = status
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return {"id": job_id, "status": "TIMED_OUT", "last_status": status}
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(self.poll_max, delay * self.poll_factor)
+
+    async def _build_input(self, item: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+        payload = dict(options)
+        if item.get("path"):
+            if asyncio.iscoroutinefunction(self.uploader):
+                source = await self.uploader(item["path"])
+            else:
+                source = await asyncio.to_thread(self.uploader, item["path"])
+            payload.update(source)
+        payload.update(item.get("input") or {})
+        return payload
+
+    async def run_job(self, item: Dict[str, Any], options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Upload (if item has a "path"), submit and poll one job.
+        Never raises: failures are returned as {"status": "ERROR", "error": ...}.
+        """
+        started = time.time()
+        record: Dict[str, Any] = {"name": item.get("name") or item.get("path")}
+        async with self._slots:
+            try:
+                payload = await self._build_input(item, options or {})
+                job_id = await self.submit(payload)
+                record["id"] = job_id
+                result = await self.poll(job_id)
+                record.update(result)
+            except Exception as e:
+                record["status"] = "ERROR"
+                record["error"] = str(e)
+        record["elapsed"] = time.time() - started
+        return record
+
+    async def run_many(
+        self,
+        items: Iterable[Dict[str, Any]],
+        out_path: str,
+        options: Optional[Dict[str, Any]] = None,
+        resume: bool = True,
+    ) -> Dict[str, int]:
+        """
+        Run every item and append one JSON line per finished job to out_path.
+
+        With resume=True, items whose name already has a COMPLETED line in
+        out_path are skipped, so an interrupted backlog can be restarted.
+        """
+        items = list(items)
+        done = _completed_names(out_path) if resume else set()
+        todo = [it for it in items if (it.get("name") or it.get("path")) not in done]
+        counts = {"skipped": len(items) - len(todo), "completed": 0, "failed": 0}
+        logger.info(f"Submitting {len(todo)} jobs ({counts['skipped']} already completed)")
+
+        tasks = [asyncio.create_task(self.run_job(it, options)) for it in todo]
+        with open(out_path, "a", encoding="utf-8") as out:
+            for fut in asyncio.as_completed(tasks):
+                record = await fut
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                if record.get("status") == "COMPLETED":
+                    counts["completed"] += 1
+                else:
+                    counts["failed"] += 1
+                    logger.warning(f"{record.get('name')}: {record.get('status')} {record.get('error', '')}")
+        return counts
+
+
+def _completed_names(out_path: str) -> set:
+    names = set()
+    if not os.path.exists(out_path):
+        return names
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                j = json.loads(line)
+            except ValueError:
+                continue
+            if j.get("status") == "COMPLETED" and j.get("name"):
+                names.add(j["name"])
+    return names
+
+
+def items_from_dir(input_dir: str) -> List[Dict[str, Any]]:
+    """One item per .mp3/.wav file in input_dir (non-recursive), keyed by file path."""
+    items = []
+    for name in sorted(os.listdir(input_dir)):
+        if name.rsplit(".", 1)[-1].lower() in AUDIO_EXTENSIONS:
+            path = os.path.join(input_dir, name)
+            items.append({"name": path, "path": path})
+    return items
+
+
+def items_from_jsonl(path: str) -> List[Dict[str, Any]]:
+    """Each line is either {"name", "path"} or {"name", "input": {...}} (a ready job input)."""
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if line:
+                j = json.loads(line)
+                j.setdefault("name", j.get("path") or f"line-{i}")
+                items.append(j)
+    return items
+
+
+# ===
+# CLI
+# ===
+def main() -> None:
+    p = argparse.ArgumentParser(description="Bulk-submit transcription jobs to RunPod.")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--input-dir", help="Directory of .mp3/.wav files (uploaded with --s3-bucket, else sent as file_b64)")
+    src.add_argument("--jobs", help="JSONL file of job items")
+    p.add_argument("--out", required=True, help="JSONL file results are appended to")
+    p.add_argument("--base-url", default=None, help=f"API base (default {RUNPOD_API_BASE})")
+    p.add_argument("--endpoint-id", default=None)
+    p.add_argument("--max-in-flight", type=int, default=32)
+    p.add_argument("--max-connections", type=int, default=16)
+    p.add_argument("--poll-initial", type=float, default=1.0)
+    p.add_argument("--poll-max", type=float, default=30.0)
+    p.add_argument("--job-timeout", type=float, default=None)
+    p.add_argument("--options", default="{}", help='JSON merged into every input, e.g. \'{"language": "en"}\'')
+    p.add_argument("--no-resume", action="store_true")
+    p.add_argument("--s3-bucket", default=RUNPOD_S3_BUCKET or None,
+                   help="Upload files to this RunPod S3 bucket and submit bucket+key (RUNPOD_S3_* credentials)")
+    p.add_argument("--s3-prefix", default="uploads/", help="Key prefix for uploaded files")
+    args = p.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    items = items_from_dir(args.input_dir) if args.input_dir else items_from_jsonl(args.jobs)
+    uploader = S3Uploader(args.s3_bucket, args.s3_prefix) if args.s3_bucket else None
+
+    async def _go():
+        async with RunPodClient(
+            endpoint_id=args.endpoint_id,
+            base_url=args.base_url,
+            max_in_flight=args.max_in_flight,
+            max_connections=args.max_connections,
+            poll_initial=args.poll_initial,
+            poll_max=args.poll_max,
+            job_timeout=args.job_timeout,
+            uploader=uploader,
+        ) as client:
+            return await client.run_many(items, args.out, json.loads(args.options), resume=not args.no_resume)
+
+    counts = asyncio.run(_go())
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# runpod_stub_server.py
+"""
+Local stand-in for the RunPod serverless job API.
+
+Serves the same routes the client uses:
+
+    POST /{endpoint_id}/run            -> {"id": ..., "status": "IN_QUEUE"}
+    POST /{endpoint_id}/runsync        -> blocks until the job finishes
+    GET  /{endpoint_id}/status/{id}    -> {"id", "status", "output", "delayTime", "executionTime"}
+
+Jobs are executed by `handler` (any callable taking the RunPod event dict)
+on a pool of `workers` threads, so queueing behaves like a fixed worker count.
+The default handler just sleeps `job_seconds` and echoes the input.
+
+    python runpod_stub_server.py --port 8000 --workers 4 --job-seconds 0.5
+    python runpod_client.py --base-url http://127.0.0.1:8000 --endpoint-id local ...
+"""
+import json
+import time
+import uuid
+import random
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def sleep_handler(job_seconds: float = 0.5) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    def _run(event: Dict[str, Any]) -> Dict[str, Any]:
+        time.sleep(job_seconds)
+        payload = event.get("input") or {}
+        return {"echo": {k: v for k, v in payload.items() if k != "file_b64"}, "transcription_time": job_seconds}
+    return _run
+
+
+class StubRunPod:
+    """In-memory job table + worker pool behind the aiohttp routes."""
+
+    def __init__(
+        self,
+        handler: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        workers: int = 1,
+        fail_rate: float = 0.0,
+    ):
+        self.handler = handler or sleep_handler()
+        self.workers = workers
+        self.fail_rate = fail_rate  # fraction of HTTP requests answered with 503
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stub-worker")
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._flaky])
+        app.router.add_post("/{endpoint}/run", self._run)
+        app.router.add_post("/{endpoint}/runsync", self._runsync)
+        app.router.add_get("/{endpoint}/status/{job_id}", self._status)
+        app.on_cleanup.append(self._shutdown)
+        return app
+
+    @web.middleware
+    async def _flaky(self, request: web.Request, handler):
+        if self.fail_rate and random.random() < self.fail_rate:
+            return web.json_response({"error": "injected failure"}, status=503)
+        return await handler(request)
+
+    async def _shutdown(self, app: web.Application) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _execute(self, job_id: str) -> None:
+        job = self.jobs[job_id]
+        job["status"] = "IN_PROGRESS"
+        job["started_at"] = time.time()
+        try:
+            output = self.handler({"id": job_id, "input": job["input"]})
+            if isinstance(output, dict) and output.get("error"):
+                job["status"] = "FAILED"
+                job["error"] = output["error"]
+            else:
+                job["status"] = "COMPLETED"
+            job["output"] = output
+        except Exception as e:
+            job["status"] = "FAILED"
+            job["error"] = str(e)
+        job["finished_at"] = time.time()
+
+    def _enqueue(self, body: Dict[str, Any]) -> str:
+        job_id = f"stub-{uuid.uuid4()}"
+        self.jobs[job_id] = {"status": "IN_QUEUE", "input": body.get("input") or {}, "submitted_at": time.time()}
+        return job_id
+
+    def _view(self, job_id: str) -> Dict[str, Any]:
+        job = self.jobs[job_id]
+        view = {"id": job_id, "status": job["status"]}
+        if "started_at" in job:
+            view["delayTime"] = int((job["started_at"] - job["submitted_at"]) * 1000)
+        if "finished_at" in job:
+            view["executionTime"] = int((job["finished_at"] - job["started_at"]) * 1000)
+        if "output" in job:
+            view["output"] = job["output"]
+        if "error" in job:
+            view["error"] = job["error"]
+        return view
+
+    async def _run(self, request: web.Request) -> web.Response:
+        job_id = self._enqueue(await request.json(loads=json.loads))
+        asyncio.get_running_loop().run_in_executor(self._pool, self._execute, job_id)
+        return web.json_response({"id": job_id, "status": "IN_QUEUE"})
+
+    async def _runsync(self, request: web.Request) -> web.Response:
+        job_id = self._enqueue(await request.json(loads=json.loads))
+        await asyncio.get_running_loop().run_in_executor(self._pool, self._execute, job_id)
+        return web.json_response(self._view(job_id))
+
+    async def _status(self, request: web.Request) -> web.Response:
+        job_id = request.match_info["job_id"]
+        if job_id not in self.jobs:
+            return web.json_response({"error": "job not found"}, status=404)
+        return web.json_response(self._view(job_id))
+
+
+async def start_stub_server(stub: StubRunPod, host: str = "127.0.0.1", port: int = 0) -> Tuple[web.AppRunner, str]:
+    """Start the stub in the running loop; returns (runner, base_url). port=0 picks a free port."""
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Local stand-in for the RunPod job API.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--job-seconds", type=float, default=0.5)
+    p.add_argument("--fail-rate", type=float, default=0.0)
+    p.add_argument("--real-handler", action="store_true", help="Run handler.run instead of the sleep stub")
+    args = p.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.real_handler:
+        import handler
+        job_handler = handler.run
+    else:
+        job_handler = sleep_handler(args.job_seconds)
+    stub = StubRunPod(handler=job_handler, workers=args.workers, fail_rate=args.fail_rate)
+    web.run_app(stub.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
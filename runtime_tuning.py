@@ -0,0 +1,165 @@
+# runtime_tuning.py
+"""
+Size thread pools to the CPU/memory this container is actually allowed to use.
+
+configure() must run before numpy/librosa/torch are imported: BLAS, OpenMP
+and numba read their thread counts from the environment at import time.
+handler.py calls it first thing.
+
+Every derived value can be pinned through the environment:
+
+    WORKER_CONCURRENCY    jobs transcribed in parallel by this worker (default 1);
+                          handler.py passes it to RunPod as the concurrency_modifier
+    WHISPER_CPU_THREADS   CTranslate2 intra-op threads per model worker
+    WHISPER_NUM_WORKERS   CTranslate2 model workers
+    BLAS_NUM_THREADS      OpenMP/OpenBLAS/MKL threads (OMP_NUM_THREADS is honoured too)
+    PREPROCESS_THREADS    torch / numba threads used by preprocessing
+"""
+import os
+import math
+from typing import Dict, Any, Optional
+
+# Rough RAM needed per CTranslate2 CPU model replica; used only to cap num_workers
+CPU_WORKER_MEMORY_BYTES = 2 * 1024 ** 3
+# CPU threads worth giving CTranslate2 when the model runs on the GPU
+GPU_HOST_THREADS = 4
+
+BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+_config: Optional[Dict[str, Any]] = None
+
+
+# =========
+# Detection
+# =========
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota in cores from cgroup v2 (cpu.max) or v1 (cfs quota/period); None if unlimited."""
+    raw = _read("/sys/fs/cgroup/cpu.max")
+    if raw:
+        quota, _, period = raw.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    for base in ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct"):
+        quota = _read(os.path.join(base, "cpu.cfs_quota_us"))
+        period = _read(os.path.join(base, "cpu.cfs_period_us"))
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+    return None
+
+
+def cgroup_memory_limit() -> Optional[int]:
+    """Memory limit in bytes from cgroup v2 (memory.max) or v1; None if unlimited."""
+    raw = _read("/sys/fs/cgroup/memory.max")
+    if raw is None:
+        raw = _read("/sys/fs/cgroup/memory/memory.limit_in_bytes")
+    if not raw or raw == "max":
+        return None
+    limit = int(raw)
+    return None if limit >= 2 ** 60 else limit  # v1 reports "unlimited" as a huge number
+
+
+def detect_resources() -> Dict[str, Any]:
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        affinity = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    try:
+        host_memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        host_memory = None
+    memory_limit = cgroup_memory_limit()
+    if memory_limit is not None and host_memory is not None:
+        memory_limit = min(memory_limit, host_memory)
+    return {
+        "cpu_affinity": affinity,
+        "cpu_quota": quota,
+        # A fractional quota (e.g. 2.5) still gets throttled above floor(quota) busy threads
+        "cpus": max(1, min(affinity, math.floor(quota) if quota else affinity)),
+        "memory_limit_bytes": memory_limit if memory_limit is not None else host_memory,
+    }
+
+
+# ==========
+# Derivation
+# ==========
+def _env_int(name: str) -> Optional[int]:
+    raw = os.getenv(name, "")
+    return int(raw) if raw.strip() else None
+
+
+def derive_config(resources: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Split the available cores between concurrent jobs. Within one job the
+    preprocessing and decoding stages run one after the other, so each
+    stage may use the job's whole share.
+    """
+    cpus = resources["cpus"]
+    overrides = {}
+    concurrency = _env_int("WORKER_CONCURRENCY") or 1
+    per_job = max(1, cpus // concurrency)
+
+    blas = _env_int("BLAS_NUM_THREADS") or _env_int("OMP_NUM_THREADS")
+    preprocess = _env_int("PREPROCESS_THREADS")
+    cpu_threads = _env_int("WHISPER_CPU_THREADS")
+    num_workers = _env_int("WHISPER_NUM_WORKERS")
+    for name, value in (("blas_threads", blas), ("preprocess_threads", preprocess),
+                        ("cpu_threads", cpu_threads), ("num_workers", num_workers)):
+        if value is not None:
+            overrides[name] = value
+
+    return {
+        "cpus": cpus,
+        "cpu_quota": resources.get("cpu_quota"),
+        "memory_limit_bytes": resources.get("memory_limit_bytes"),
+        "concurrency": concurrency,
+        "blas_threads": blas or per_job,
+        "preprocess_threads": preprocess or per_job,
+        # Model-side counts; cpu_threads is resolved per device in model_threads()
+        "cpu_threads": cpu_threads,
+        "num_workers": num_workers or concurrency,
+        "overrides": overrides,
+    }
+
+
+def model_threads(config: Dict[str, Any], device: str) -> Dict[str, int]:
+    """cpu_threads / num_workers for WhisperModel on the resolved device."""
+    num_workers = config["num_workers"]
+    memory = config.get("memory_limit_bytes")
+    if device != "cuda" and "num_workers" not in config["overrides"] and memory:
+        # Each CPU worker holds its own model replica
+        num_workers = max(1, min(num_workers, memory // CPU_WORKER_MEMORY_BYTES))
+    cpu_threads = config["cpu_threads"]
+    if cpu_threads is None:
+        if device == "cuda":
+            cpu_threads = min(GPU_HOST_THREADS, config["cpus"])
+        else:
+            cpu_threads = max(1, config["cpus"] // num_workers)
+    return {"cpu_threads": cpu_threads, "num_workers": num_workers}
+
+
+def configure() -> Dict[str, Any]:
+    """Detect resources, export BLAS/numba thread env vars and cache the result (idempotent)."""
+    global _config
+    if _config is not None:
+        return _config
+    _config = derive_config(detect_resources())
+    for var in BLAS_ENV_VARS:
+        os.environ[var] = str(_config["blas_threads"])
+    os.environ["NUMBA_NUM_THREADS"] = str(_config["preprocess_threads"])
+    return _config
@@ -5,24 +5,148 @@ from scipy import signal
 import soundfile as sf
 import librosa
 from faster_whisper import WhisperModel
+import ctranslate2
 import numpy as np
 import torch
 import os
 import sys
 import time
 import logging
+import threading
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any
 import warnings
+import runtime_tuning
+import incremental
 warnings.filterwarnings("ignore")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Best-first compute types per device; "auto" picks the first one the host supports
+COMPUTE_TYPE_PREFERENCE = {
+    "cuda": ["float16", "int8_float16", "bfloat16", "int8", "float32"],
+    "cpu": ["int8_float32", "int8", "float32"],
+}
+
+# Per-device decode defaults. On CPU the decoder dominates, so let Silero VAD
+# drop silence before it ever reaches the model.
+DECODE_DEFAULTS = {
+    "cuda": {"vad_filter": False},
+    "cpu": {"vad_filter": True},
+}
+
+def resolve_device(requested: str = "auto") -> str:
+    has_cuda = torch.cuda.is_available()
+    if requested == "cpu":
+        return "cpu"
+    if requested == "cuda" and not has_cuda:
+        logger.warning("CUDA requested but not available; falling back to CPU")
+    return "cuda" if has_cuda else "cpu"
+
+def resolve_compute_type(device: str, requested: str = "auto") -> List[str]:
+    """Supported compute types to try, in order: the requested one (if usable) first."""
+    supported = ctranslate2.get_supported_compute_types(device)
+    candidates = [c for c in COMPUTE_TYPE_PREFERENCE[device] if c in supported]
+    if requested and requested not in ("auto", "default"):
+        if requested in supported:
+            candidates = [requested] + [c for c in candidates if c != requested]
+        else:
+            logger.warning(f"compute_type={requested} is not supported on {device}; using {candidates[0]}")
+    return candidates
+
+INITIAL_PROMPT = "This is a professional transcription. Please be accurate with technical terms, proper nouns, and punctuation."
+
+DEFAULT_VAD_PARAMETERS = {
+    "threshold": 0.6,
+    "min_speech_duration_ms": 500,
+    "max_speech_duration_s": 20,
+    "min_silence_duration_ms": 300,
+    "speech_pad_ms": 200
+}
+
+# Draft-and-refine: a draft segment is re-decoded by the main model when its
+# avg_logprob or its mean word probability falls below these thresholds.
+REFINE_LOGPROB_THRESHOLD = -0.6
+REFINE_WORD_PROB_THRESHOLD = 0.5
+REFINE_MERGE_GAP_S = 1.0  # flagged segments closer than this are refined together
+REFINE_PAD_S = 0.2        # context added on each side of a region
+
+def low_confidence(segment: Dict[str, Any], logprob_threshold: float, word_threshold: float) -> bool:
+    if segment["confidence"] < logprob_threshold:
+        return True
+    words = segment.get("words") or []
+    return bool(words) and sum(w["confidence"] for w in words) / len(words) < word_threshold
+
+def refine_regions(segments: List[Dict[str, Any]], logprob_threshold: float, word_threshold: float,
+                   merge_gap: float = REFINE_MERGE_GAP_S) -> List[Tuple[float, float]]:
+    """(start, end) spans covering the low-confidence segments, merged across short gaps."""
+    regions: List[Tuple[float, float]] = []
+    for segment in sorted(segments, key=lambda seg: seg["start"]):
+        if not low_confidence(segment, logprob_threshold, word_threshold):
+            continue
+        if regions and segment["start"] - regions[-1][1] <= merge_gap:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], segment["end"]))
+        else:
+            regions.append((segment["start"], segment["end"]))
+    return regions
+
+def clip_segment(segment: Dict[str, Any], start: float, end: float) -> Optional[Dict[str, Any]]:
+    """
+    Restrict a refined segment to [start, end]: words centred outside are
+    dropped and text/bounds rebuilt from the rest. Without word times the
+    segment is kept only if centred inside, with its bounds clamped.
+    """
+    words = segment.get("words") or []
+    if words:
+        kept = [w for w in words if start <= (w["start"] + w["end"]) / 2 <= end]
+        if not kept:
+            return None
+        return {**segment, "words": kept, "text": " ".join(w["word"] for w in kept),
+                "start": max(start, kept[0]["start"]), "end": min(end, kept[-1]["end"])}
+    if not start <= (segment["start"] + segment["end"]) / 2 <= end:
+        return None
+    return {**segment, "start": max(start, segment["start"]), "end": min(end, segment["end"])}
+
+PREPROCESS_PROFILES = ("none", "fast", "full", "auto")
+
+# Timestamp precision per job, cheapest first:
+#   none    - no timestamp tokens (window-level times only), for text-only output
+#   segment - segment times; generate_srt spreads words proportionally
+#   word    - extra cross-attention alignment pass for per-word times
+TIMING_PRECISIONS = ("none", "segment", "word")
+
+# "auto" skips spectral subtraction at or above this estimated SNR
+AUTO_CLEAN_SNR_DB = 25.0
+
+# Starting guesses (seconds per audio second) for stages a profile skips,
+# refined from measured runs; only used to report time saved.
+STAGE_COST_SEED = {"normalize": 0.0005, "reduce_noise": 0.01, "vad": 0.004}
+
 class AudioPreprocessor:
-    def __init__(self, target_sr: int = 16000):
+    def __init__(self, target_sr: int = 16000, device: Optional[str] = None):
+        # librosa/numpy always run on the CPU; `device` is accepted for a uniform constructor
         self.target_sr = target_sr
         self.vad = webrtcvad.Vad(2)
+        self.stage_cost = dict(STAGE_COST_SEED)
+
+    def estimate_snr(self, audio: np.ndarray, sr: int, windows: int = 16, window_s: float = 1.0) -> Optional[float]:
+        """
+        Rough SNR in dB from `windows` evenly spaced slices: loud (p90) vs
+        quiet (p10) 20 ms frame RMS. Returns None if the clip is too short.
+        """
+        frame = int(0.02 * sr)
+        win = int(window_s * sr)
+        if len(audio) < frame * 10:
+            return None
+        if len(audio) <= win * windows:
+            sample = audio
+        else:
+            starts = np.linspace(0, len(audio) - win, windows).astype(int)
+            sample = np.concatenate([audio[s:s + win] for s in starts])
+        frames = sample[:len(sample) // frame * frame].reshape(-1, frame)
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1)) + 1e-10
+        return float(20 * np.log10(np.percentile(rms, 90) / np.percentile(rms, 10)))
 
     def normalize_audio(self, audio: np.ndarray) -> np.ndarray:
         rms = np.sqrt(np.mean(audio**2))
@@ -46,7 +170,8 @@ class AudioPreprocessor:
         audio_clean = librosa.istft(D_clean, hop_length=512)
         return audio_clean
 
-    def apply_vad(self, audio: np.ndarray, sr: int):
+    def apply_vad(self, audio: np.ndarray, sr: int, vad: Optional[webrtcvad.Vad] = None):
+        vad = vad or self.vad
         audio_16bit = (audio * 32767).astype(np.int16)
         frame_duration = 30
         frame_length = int(sr * frame_duration / 1000)
@@ -58,7 +183,7 @@ class AudioPreprocessor:
                 frame_resampled = librosa.resample(frame.astype(np.float32), orig_sr=sr, target_sr=16000).astype(np.int16)
             else:
                 frame_resampled = frame
-            is_speech = self.vad.is_speech(frame_resampled.tobytes(), 16000)
+            is_speech = vad.is_speech(frame_resampled.tobytes(), 16000)
             voiced_frames.append(is_speech)
             if is_speech:
                 start_time = i / sr
@@ -74,44 +199,210 @@ class AudioPreprocessor:
             speech_segments = merged_segments
         return audio, speech_segments
 
-    def preprocess_audio(self, audio_path: str):
+    def load_audio(self, audio_path: str) -> Tuple[np.ndarray, int]:
         logger.info(f"Loading audio: {audio_path}")
         audio, sr = librosa.load(audio_path, sr=None)
         logger.info(f"Original: {len(audio)/sr:.2f}s, {sr}Hz")
         if sr != self.target_sr:
-            audio = librosa.resample(audio, orig_sr=sr, target_sr=self.target_sr)
+            audio = self.resample(audio, sr, self.target_sr)
             sr = self.target_sr
-        audio = self.normalize_audio(audio)
-        audio = self.reduce_noise(audio, sr)
-        audio, speech_segments = self.apply_vad(audio, sr)
-        logger.info(f"Preprocessing complete. Found {len(speech_segments)} speech segments")
-        return audio.astype(np.float32), sr, speech_segments
+        return audio, sr
+
+    def resample(self, audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+        return librosa.resample(audio, orig_sr=orig_sr, target_sr=target_sr)
+
+    def preprocess_array(self, audio: np.ndarray, sr: int, profile: str = "full", vad_filter: bool = False):
+        """
+        Run the stages selected by `profile`:
+
+          none  - pass-through
+          fast  - normalize; webrtcvad only if the model's own VAD is off
+          full  - normalize + spectral subtraction + webrtcvad
+          auto  - "fast" when the estimated SNR is high, else "full"
+
+        Returns (audio, sr, speech_segments, report).
+        """
+        if profile not in PREPROCESS_PROFILES:
+            raise ValueError(f"Unknown preprocess profile: {profile}")
+        report: Dict[str, Any] = {"profile_requested": profile, "snr_db": None}
+        stages: Dict[str, float] = {}
+        if profile == "auto":
+            t = time.time()
+            snr = self.estimate_snr(audio, sr)
+            stages["snr_estimate"] = time.time() - t
+            report["snr_db"] = None if snr is None else round(snr, 1)
+            profile = "fast" if snr is not None and snr >= AUTO_CLEAN_SNR_DB else "full"
+
+        run = {
+            "normalize": profile in ("fast", "full"),
+            "reduce_noise": profile == "full",
+            "vad": profile == "full" or (profile == "fast" and not vad_filter),
+        }
+        speech_segments = []
+        if run["normalize"]:
+            t = time.time()
+            audio = self.normalize_audio(audio)
+            stages["normalize"] = time.time() - t
+        if run["reduce_noise"]:
+            t = time.time()
+            audio = self.reduce_noise(audio, sr)
+            stages["reduce_noise"] = time.time() - t
+        if run["vad"]:
+            t = time.time()
+            # webrtcvad keeps per-stream state, so concurrent jobs must not share one
+            audio, speech_segments = self.apply_vad(audio, sr, vad=webrtcvad.Vad(2))
+            stages["vad"] = time.time() - t
+
+        duration = len(audio) / sr if sr else 0.0
+        skipped = [stage for stage, enabled in run.items() if not enabled]
+        if duration > 0:
+            for stage in run:
+                if stage in stages:
+                    self.stage_cost[stage] = 0.8 * self.stage_cost[stage] + 0.2 * stages[stage] / duration
+        saved = sum(self.stage_cost[stage] * duration for stage in skipped) - stages.get("snr_estimate", 0.0)
+        report.update({
+            "profile": profile,
+            "stages": stages,
+            "skipped": skipped,
+            "time_saved_est": max(0.0, saved),
+        })
+        logger.info(f"Preprocessing ({profile}) complete. Found {len(speech_segments)} speech segments")
+        return audio.astype(np.float32), sr, speech_segments, report
+
+    def preprocess_audio(self, audio_path: str, profile: str = "full", vad_filter: bool = False):
+        t = time.time()
+        audio, sr = self.load_audio(audio_path)
+        load_time = time.time() - t
+        audio, sr, speech_segments, report = self.preprocess_array(audio, sr, profile=profile, vad_filter=vad_filter)
+        report["stages"] = {"load": load_time, **report["stages"]}
+        return audio, sr, speech_segments, report
+
+class TorchAudioPreprocessor(AudioPreprocessor):
+    """
+    Same stages as AudioPreprocessor, with resampling, normalization and
+    spectral subtraction done in torch: on the GPU when one is available,
+    otherwise on torch's intra-op CPU thread pool. webrtcvad is unchanged.
+    """
+    def __init__(self, target_sr: int = 16000, device: Optional[str] = None):
+        super().__init__(target_sr, device)
+        self.torch_device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        self._windows: Dict[int, torch.Tensor] = {}
+
+    def _tensor(self, audio: np.ndarray) -> torch.Tensor:
+        return torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32)).to(self.torch_device)
+
+    def _window(self, n_fft: int) -> torch.Tensor:
+        if n_fft not in self._windows:
+            # periodic Hann, as librosa/scipy use for STFT
+            self._windows[n_fft] = torch.hann_window(n_fft, periodic=True, device=self.torch_device)
+        return self._windows[n_fft]
+
+    def resample(self, audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+        try:
+            import torchaudio.functional as AF
+        except ImportError:
+            return super().resample(audio, orig_sr, target_sr)
+        with torch.inference_mode():
+            out = AF.resample(self._tensor(audio), orig_sr, target_sr, lowpass_filter_width=16, rolloff=0.945,
+                              resampling_method="sinc_interp_kaiser", beta=14.769656459379492)
+        return out.cpu().numpy()
+
+    def normalize_audio(self, audio: np.ndarray) -> np.ndarray:
+        with torch.inference_mode():
+            x = self._tensor(audio)
+            rms = torch.sqrt(torch.mean(x ** 2))
+            if rms > 0:
+                x = x / rms * 0.1
+            max_val = torch.max(torch.abs(x))
+            if max_val > 0:
+                x = x / max_val * 0.9
+            return x.cpu().numpy()
+
+    def reduce_noise(self, audio: np.ndarray, sr: int) -> np.ndarray:
+        n_fft, hop = 2048, 512
+        with torch.inference_mode():
+            x = self._tensor(audio)
+            window = self._window(n_fft)
+            # center/pad_mode match librosa.stft defaults
+            D = torch.stft(x, n_fft=n_fft, hop_length=hop, window=window, center=True,
+                           pad_mode="constant", return_complex=True)
+            magnitude = D.abs()
+            noise_frames = int(0.5 * sr / hop)
+            noise_magnitude = torch.mean(magnitude[:, :noise_frames], dim=1, keepdim=True)
+            alpha = 2.0
+            magnitude_clean = torch.maximum(magnitude - alpha * noise_magnitude, 0.1 * magnitude)
+            D_clean = torch.polar(magnitude_clean, torch.angle(D))
+            audio_clean = torch.istft(D_clean, n_fft=n_fft, hop_length=hop, window=window, center=True)
+            return audio_clean.cpu().numpy()
+
+PREPROCESS_BACKENDS = {
+    "librosa": AudioPreprocessor,
+    "torch": TorchAudioPreprocessor,
+}
+
+def make_preprocessor(backend: str = "librosa", target_sr: int = 16000, device: Optional[str] = None) -> AudioPreprocessor:
+    """`device` ("cuda" | "cpu") pins torch preprocessing; None uses the GPU when one is visible."""
+    if backend not in PREPROCESS_BACKENDS:
+        raise ValueError(f"Unknown preprocess backend: {backend}. Use one of: {', '.join(PREPROCESS_BACKENDS)}")
+    return PREPROCESS_BACKENDS[backend](target_sr, device=device)
 
 class ProfessionalTranscriber:
-    def __init__(self, model_size: str = "large-v3", device: str = "cuda", compute_type: str = "float16"):
+    def __init__(self, model_size: str = "large-v3", device: str = "auto", compute_type: str = "auto",
+                 cpu_threads: Optional[int] = None, num_workers: Optional[int] = None,
+                 preprocess_backend: str = "librosa", draft_model_size: Optional[str] = None,
+                 segment_cache: Optional[incremental.SegmentCache] = None):
         self.model_size = model_size
-        self.device = device
-        self.compute_type = compute_type
-        self.preprocessor = AudioPreprocessor()
+        self.segment_cache = segment_cache or incremental.SegmentCache()
+        self.draft_model_size = draft_model_size
+        self.draft_model = None  # loaded on first draft-and-refine job
+        self._draft_lock = threading.Lock()
         logger.info(f"Loading Faster-Whisper model: {model_size}")
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+        device = resolve_device(device)
         print(f"selected device:{device}")
-        self.model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=8, num_workers=4)
+        self.device = device
+        # Preprocessing follows the model's device, so WHISPER_DEVICE=cpu keeps torch off the GPU
+        self.preprocessor = make_preprocessor(preprocess_backend, device=device)
+        self.decode_defaults = DECODE_DEFAULTS[device]
+        runtime = runtime_tuning.configure()
+        threads = runtime_tuning.model_threads(runtime, device)
+        if cpu_threads is not None:
+            threads["cpu_threads"] = cpu_threads
+        if num_workers is not None:
+            threads["num_workers"] = num_workers
+        torch.set_num_threads(runtime["preprocess_threads"])
+        self.model = None
+        for candidate in resolve_compute_type(device, compute_type):
+            try:
+                self.model = WhisperModel(model_size, device=device, compute_type=candidate, **threads)
+            except ValueError as e:
+                # CTranslate2 rejects compute types the backend can't run efficiently
+                logger.warning(f"compute_type={candidate} failed to load on {device}: {e}")
+                continue
+            self.compute_type = candidate
+            break
+        if self.model is None:
+            raise RuntimeError(f"No usable compute type for {model_size} on {device}")
+        self.runtime = {**runtime, "device": device, "compute_type": self.compute_type,
+                        "preprocess_backend": preprocess_backend, **threads}
+        logger.info(f"Runtime config: {self.runtime}")
         logger.info("Model loaded successfully")
 
-    def transcribe_audio(self, audio_path: str, language: str = "en", vad_filter: bool = True, vad_parameters: dict = None):
-        if vad_parameters is None:
-            vad_parameters = {
-                "threshold": 0.6,
-                "min_speech_duration_ms": 500,
-                "max_speech_duration_s": 20,
-                "min_silence_duration_ms": 300,
-                "speech_pad_ms": 200
-            }
-        audio, sr, speech_segments = self.preprocessor.preprocess_audio(audio_path)
-        logger.info("Starting transcription...")
-        start_time = time.time()
-        segments, info = self.model.transcribe(
+    def _get_draft_model(self):
+        with self._draft_lock:
+            if self.draft_model is None:
+                if not self.draft_model_size:
+                    raise RuntimeError("Draft-and-refine requires a draft_model_size")
+                logger.info(f"Loading draft model: {self.draft_model_size}")
+                self.draft_model = WhisperModel(
+                    self.draft_model_size, device=self.device, compute_type=self.compute_type,
+                    cpu_threads=self.runtime["cpu_threads"], num_workers=self.runtime["num_workers"]
+                )
+        return self.draft_model
+
+    def _decode(self, model, audio: np.ndarray, language: Optional[str], vad_filter: bool, vad_parameters: dict,
+                offset: float = 0.0, timing: str = "word"):
+        """Run `model` over `audio`; segment/word times are shifted by `offset` seconds."""
+        segments, info = model.transcribe(
             audio,
             language=language,
             beam_size=1,
@@ -120,16 +411,16 @@ class ProfessionalTranscriber:
             condition_on_previous_text=False,
             vad_filter=vad_filter,
             vad_parameters=vad_parameters,
-            word_timestamps=True,
-            initial_prompt="This is a professional transcription. Please be accurate with technical terms, proper nouns, and punctuation."
+            word_timestamps=timing == "word",
+            without_timestamps=timing == "none",
+            initial_prompt=INITIAL_PROMPT
         )
         transcription_segments = []
-        full_text = []
         for segment in segments:
             segment_dict = {
                 "id": segment.id,
-                "start": segment.start,
-                "end": segment.end,
+                "start": segment.start + offset,
+                "end": segment.end + offset,
                 "text": segment.text.strip(),
                 "confidence": getattr(segment, 'avg_logprob', 0.0),
                 "words": []
@@ -137,13 +428,81 @@ class ProfessionalTranscriber:
             if hasattr(segment, 'words') and segment.words:
                 for word in segment.words:
                     segment_dict["words"].append({
-                        "start": word.start,
-                        "end": word.end,
+                        "start": word.start + offset,
+                        "end": word.end + offset,
                         "word": word.word.strip(),
                         "confidence": word.probability
                     })
             transcription_segments.append(segment_dict)
-            full_text.append(segment.text.strip())
+        return transcription_segments, info
+
+    def _refine(self, audio: np.ndarray, sr: int, segments: List[Dict[str, Any]], language: Optional[str],
+                vad_filter: bool, vad_parameters: dict, logprob_threshold: float, word_threshold: float,
+                timing: str = "word"):
+        """Re-decode low-confidence regions of `segments` with the main model and splice them in."""
+        regions = refine_regions(segments, logprob_threshold, word_threshold)
+        for start, end in regions:
+            a = max(0, int((start - REFINE_PAD_S) * sr))
+            b = min(len(audio), int((end + REFINE_PAD_S) * sr))
+            refined, _ = self._decode(self.model, audio[a:b], language, vad_filter, vad_parameters,
+                                      offset=a / sr, timing=timing)
+            # Draft segments centred in the region are replaced; the padding only gives the
+            # model context, so refined output is clipped to the region to avoid duplicates
+            in_region = lambda seg: start <= (seg["start"] + seg["end"]) / 2 <= end
+            refined = [clipped for clipped in (clip_segment(seg, start, end) for seg in refined) if clipped]
+            segments = [seg for seg in segments if not in_region(seg)] + refined
+        segments.sort(key=lambda seg: seg["start"])
+        for i, seg in enumerate(segments, 1):
+            seg["id"] = i
+        return segments, regions
+
+    def transcribe_audio(self, audio_path: str, language: str = "en", vad_filter: Optional[bool] = None, vad_parameters: dict = None,
+                         preprocess_profile: str = "full", refine: bool = False,
+                         refine_threshold: Optional[float] = None, refine_word_threshold: Optional[float] = None,
+                         timing: str = "word"):
+        if timing not in TIMING_PRECISIONS:
+            raise ValueError(f"Unknown timing precision: {timing}")
+        if vad_filter is None:
+            vad_filter = self.decode_defaults["vad_filter"]
+        if vad_parameters is None:
+            vad_parameters = dict(DEFAULT_VAD_PARAMETERS)
+        preprocess_start = time.time()
+        audio, sr, speech_segments, preprocessing = self.preprocessor.preprocess_audio(
+            audio_path, profile=preprocess_profile, vad_filter=vad_filter
+        )
+        preprocess_time = time.time() - preprocess_start
+        logger.info("Starting transcription...")
+        start_time = time.time()
+        refinement = None
+        if refine:
+            # refine_regions needs segment bounds and word probabilities from the draft,
+            # whatever precision the final output asks for; the draft model is cheap to align
+            transcription_segments, info = self._decode(self._get_draft_model(), audio, language, vad_filter, vad_parameters,
+                                                        timing="word")
+            draft_time = time.time() - start_time
+            logprob_threshold = REFINE_LOGPROB_THRESHOLD if refine_threshold is None else refine_threshold
+            word_threshold = REFINE_WORD_PROB_THRESHOLD if refine_word_threshold is None else refine_word_threshold
+            transcription_segments, regions = self._refine(
+                audio, sr, transcription_segments, language or info.language, vad_filter, vad_parameters,
+                logprob_threshold, word_threshold, timing=timing
+            )
+            refined_seconds = float(sum(end - start for start, end in regions))
+            refinement = {
+                "draft_model": self.draft_model_size,
+                "refine_model": self.model_size,
+                "logprob_threshold": logprob_threshold,
+                "word_threshold": word_threshold,
+                "regions": len(regions),
+                "refined_seconds": refined_seconds,
+                "refined_fraction": refined_seconds / info.duration if info.duration else 0.0,
+                "draft_time": draft_time,
+                "refine_time": time.time() - start_time - draft_time,
+            }
+            logger.info(f"Refined {len(regions)} regions ({refinement['refined_fraction']:.1%} of audio)")
+        else:
+            transcription_segments, info = self._decode(self.model, audio, language, vad_filter, vad_parameters,
+                                                        timing=timing)
+        full_text = [segment["text"] for segment in transcription_segments]
         end_time = time.time()
         results = {
             "segments": transcription_segments,
@@ -152,12 +511,112 @@ class ProfessionalTranscriber:
             "language_probability": info.language_probability,
             "duration": info.duration,
             "transcription_time": end_time - start_time,
+            "preprocess_time": preprocess_time,
+            "preprocessing": preprocessing,
+            "refinement": refinement,
+            "timing": timing,
             "speech_segments": speech_segments
         }
         logger.info(f"Transcription completed in {end_time - start_time:.2f}s")
         logger.info(f"Detected language: {info.language} (confidence: {info.language_probability:.2f})")
         return results
 
+    def transcribe_incremental(self, audio_path: str, language: str = "en", vad_filter: Optional[bool] = None,
+                               vad_parameters: dict = None, preprocess_profile: str = "full", timing: str = "word"):
+        """
+        Like transcribe_audio, but cuts the decoded 16 kHz signal at VAD
+        silence gaps and reuses cached segments for chunks already seen, so
+        a resubmitted growing recording only pays for its new audio.
+        Chunks are preprocessed independently.
+        """
+        if vad_filter is None:
+            vad_filter = self.decode_defaults["vad_filter"]
+        if vad_parameters is None:
+            vad_parameters = dict(DEFAULT_VAD_PARAMETERS)
+        preprocess_start = time.time()
+        raw, sr = self.preprocessor.load_audio(audio_path)
+        # Fresh VAD state so boundaries depend only on the audio, not on earlier jobs
+        _, speech_segments = self.preprocessor.apply_vad(raw, sr, vad=webrtcvad.Vad(2))
+        duration = len(raw) / sr
+        chunks = incremental.chunk_boundaries(speech_segments, duration)
+        settings = {
+            "model": self.model_size, "compute_type": self.compute_type, "language": language,
+            "vad_filter": vad_filter, "vad_parameters": vad_parameters, "preprocess_profile": preprocess_profile,
+            "timing": timing,
+        }
+        preprocess_time = time.time() - preprocess_start
+
+        logger.info(f"Incremental transcription over {len(chunks)} chunks...")
+        transcription_time = 0.0
+        transcription_segments = []
+        stage_totals: Dict[str, float] = {}
+        profiles = set()
+        time_saved = 0.0
+        detected_language, language_probability = None, None
+        reused, reused_seconds = 0, 0.0
+        for chunk_start, chunk_end in chunks:
+            a, b = int(round(chunk_start * sr)), int(round(chunk_end * sr))
+            if b <= a:
+                continue
+            pcm = raw[a:b]
+            key = incremental.chunk_key(pcm, settings)
+            entry = self.segment_cache.get(key)
+            if entry is not None:
+                reused += 1
+                reused_seconds += chunk_end - chunk_start
+            else:
+                t = time.time()
+                audio, _, _, report = self.preprocessor.preprocess_array(
+                    pcm.copy(), sr, profile=preprocess_profile, vad_filter=vad_filter
+                )
+                preprocess_time += time.time() - t
+                for stage, secs in report["stages"].items():
+                    stage_totals[stage] = stage_totals.get(stage, 0.0) + secs
+                profiles.add(report["profile"])
+                time_saved += report["time_saved_est"]
+                t = time.time()
+                segments, info = self._decode(self.model, audio, language, vad_filter, vad_parameters, timing=timing)
+                transcription_time += time.time() - t
+                entry = {"segments": segments, "language": info.language,
+                         "language_probability": info.language_probability}
+                self.segment_cache.put(key, entry)
+            if detected_language is None:
+                detected_language, language_probability = entry["language"], entry["language_probability"]
+            for segment in entry["segments"]:
+                shifted = dict(segment, start=segment["start"] + chunk_start, end=segment["end"] + chunk_start)
+                shifted["words"] = [dict(w, start=w["start"] + chunk_start, end=w["end"] + chunk_start)
+                                    for w in segment["words"]]
+                transcription_segments.append(shifted)
+        for i, segment in enumerate(transcription_segments, 1):
+            segment["id"] = i
+        results = {
+            "segments": transcription_segments,
+            "full_text": " ".join(segment["text"] for segment in transcription_segments),
+            "language": detected_language,
+            "language_probability": language_probability,
+            "duration": duration,
+            "transcription_time": transcription_time,
+            "preprocess_time": preprocess_time,
+            "preprocessing": {
+                "profile_requested": preprocess_profile,
+                "profile": profiles.pop() if len(profiles) == 1 else sorted(profiles) or None,
+                "stages": stage_totals,
+                "time_saved_est": time_saved,
+            },
+            "refinement": None,
+            "timing": timing,
+            "incremental": {
+                "chunks": len(chunks),
+                "reused_chunks": reused,
+                "transcribed_chunks": len(chunks) - reused,
+                "reused_seconds": reused_seconds,
+                "transcribed_seconds": duration - reused_seconds,
+            },
+            "speech_segments": speech_segments
+        }
+        logger.info(f"Incremental: reused {reused}/{len(chunks)} chunks ({reused_seconds:.1f}s of {duration:.1f}s)")
+        return results
+
     def generate_srt(self, results: Dict[str, Any], output_path: str = None, max_words_per_line: int = 7) -> str:
         import re
         if output_path is None:
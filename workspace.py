@@ -0,0 +1,157 @@
+# workspace.py
+"""
+Per-job scratch directories.
+
+    with JobWorkspace() as ws:
+        path = ws.file("input.mp3", size_hint=nbytes)
+        ...
+    # directory is gone here, whatever happened inside
+
+The directory is created on the first ws.file() call. It goes to a
+RAM-backed tmpfs (/dev/shm) when the size hint fits the worker-wide RAM
+budget and the tmpfs has room, otherwise to the regular temp dir. Writers
+report bytes through charge()/account(); a job that goes over its quota
+gets ScratchQuotaExceeded.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+MB = 1024 * 1024
+
+SCRATCH_RAM_DIR       = os.getenv("SCRATCH_RAM_DIR", "/dev/shm")
+SCRATCH_RAM_BUDGET_MB = int(os.getenv("SCRATCH_RAM_BUDGET_MB", "512"))   # shared by all jobs on this worker
+SCRATCH_QUOTA_MB      = int(os.getenv("SCRATCH_QUOTA_MB", "4096"))       # per job
+
+# RAM placement needs the hinted size plus this much room for outputs
+RAM_HEADROOM_BYTES = 8 * MB
+
+
+class ScratchQuotaExceeded(RuntimeError):
+    pass
+
+
+class _RamLedger:
+    """Bytes currently reserved in the RAM scratch area across all live workspaces."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reserved = 0
+        self.peak = 0
+
+
+_ram = _RamLedger()
+
+
+class JobWorkspace:
+    def __init__(
+        self,
+        quota_bytes: int = SCRATCH_QUOTA_MB * MB,
+        ram_budget_bytes: int = SCRATCH_RAM_BUDGET_MB * MB,
+        ram_dir: Optional[str] = SCRATCH_RAM_DIR,
+        disk_dir: Optional[str] = None,
+    ):
+        self.quota_bytes = quota_bytes
+        self.ram_budget_bytes = ram_budget_bytes
+        self.ram_dir = ram_dir
+        self.disk_dir = disk_dir
+        self.root: Optional[str] = None
+        self.location: Optional[str] = None  # "ram" | "disk"
+        self.bytes = 0
+        self.peak_bytes = 0
+        self._ram_reserved = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "JobWorkspace":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+    # =========
+    # Placement
+    # =========
+    def _ram_fits(self, size_hint: Optional[int]) -> bool:
+        if size_hint is None or not self.ram_dir or not os.path.isdir(self.ram_dir):
+            return False
+        need = size_hint + RAM_HEADROOM_BYTES
+        if not os.access(self.ram_dir, os.W_OK):
+            return False
+        try:
+            if shutil.disk_usage(self.ram_dir).free < need:
+                return False
+        except OSError:
+            return False
+        with _ram.lock:
+            if _ram.reserved + need > self.ram_budget_bytes:
+                return False
+            _ram.reserved += need
+            _ram.peak = max(_ram.peak, _ram.reserved)
+        self._ram_reserved = need
+        return True
+
+    def _ensure_root(self, size_hint: Optional[int]) -> str:
+        if self.root is None:
+            if self._ram_fits(size_hint):
+                self.root = tempfile.mkdtemp(prefix="job-", dir=self.ram_dir)
+                self.location = "ram"
+            else:
+                self.root = tempfile.mkdtemp(prefix="job-", dir=self.disk_dir)
+                self.location = "disk"
+        return self.root
+
+    def file(self, name: str, size_hint: Optional[int] = None) -> str:
+        """Path for `name` inside the workspace. The first call decides RAM vs disk from size_hint."""
+        if size_hint is not None:
+            self.check(size_hint)
+        return os.path.join(self._ensure_root(size_hint), name)
+
+    # ==========
+    # Accounting
+    # ==========
+    def check(self, nbytes: int) -> None:
+        """Raise if adding nbytes would exceed the quota (without charging them)."""
+        if self.bytes + nbytes > self.quota_bytes:
+            raise ScratchQuotaExceeded(
+                f"Scratch quota exceeded: {self.bytes + nbytes} > {self.quota_bytes} bytes"
+            )
+
+    def charge(self, nbytes: int) -> None:
+        with self._lock:
+            self.check(nbytes)
+            self.bytes += nbytes
+            self.peak_bytes = max(self.peak_bytes, self.bytes)
+
+    def account(self, path: str) -> None:
+        """Charge a file written by someone else (boto3, shutil, generate_srt...)."""
+        self.charge(os.path.getsize(path))
+
+    def release(self, path: str) -> None:
+        """Delete a scratch file early and give its bytes back."""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self.bytes = max(0, self.bytes - size)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "location": self.location,
+            "bytes": self.bytes,
+            "peak_bytes": self.peak_bytes,
+            "quota_bytes": self.quota_bytes,
+            "worker_ram_peak_bytes": _ram.peak,
+        }
+
+    def cleanup(self) -> None:
+        if self.root is not None:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
+        if self._ram_reserved:
+            with _ram.lock:
+                _ram.reserved -= self._ram_reserved
+            self._ram_reserved = 0